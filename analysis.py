@@ -1,57 +1,129 @@
 import config
-from retrieval import get_sentinel2_collection, get_s2_cloudless_collection
+from retrieval import (get_sentinel2_collection_for_point,
+                       get_s2_cloudless_collection_for_point)
 from cloud import apply_comprehensive_cloud_mask
 from compositing import create_composite
-from soil import (calculate_selected_indices, create_bare_soil_mask, 
-                  get_soil_statistics)
-from main import (get_all_indices_histograms, get_all_visualization_urls)
+from soil import (calculate_selected_indices, create_bare_soil_mask)
+from main import (compute_stats_and_histograms,
+                  compute_stats_and_histograms_tiled,
+                  get_all_visualization_urls)
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from threading import Lock
+import time
 import ee
 
 
 class AnalysisError(Exception):
     pass
 
+
+# In-process cache of analyze_fun results. Dashboard reloads commonly repeat
+# the exact same request, which would otherwise re-run the whole GEE pipeline.
+# Entries expire before the signed thumbnail URLs they contain (~1 hour).
+_CACHE_TTL_SECONDS = 3500
+_CACHE_MAX_ENTRIES = 256
+
+# Above this buffer radius, statistics/histograms are reduced per tile in
+# parallel instead of in one reduceRegion over the whole disk.
+_TILED_STATS_BUFFER_M = 4000
+
+_result_cache = OrderedDict()
+_cache_lock = Lock()
+
+
+def _cache_key(latitude, longitude, buffer_m, cloud_thresh, start_date, end_date,
+               sample_fraction):
+    # buffer_m and cloud_thresh go into the pipeline as-is, so the key
+    # must carry their full values: truncating to int would serve one
+    # caller results computed under another caller's threshold
+    return (
+        round(latitude, 6),
+        round(longitude, 6),
+        float(buffer_m),
+        float(cloud_thresh),
+        start_date,
+        end_date,
+        sample_fraction
+    )
+
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        results, expires_at = entry
+        if time.time() > expires_at:
+            del _result_cache[key]
+            return None
+        _result_cache.move_to_end(key)
+        return results
+
+
+def _cache_put(key, results):
+    with _cache_lock:
+        _result_cache[key] = (results, time.time() + _CACHE_TTL_SECONDS)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _CACHE_MAX_ENTRIES:
+            _result_cache.popitem(last=False)
+
+
 def analyze_fun(
     latitude: float = None,
     longitude: float = None,
     buffer_m: int = None,
     cloud_max: int = None,
     start_date: str = None, 
-    end_date: str = None
+    end_date: str = None,
+    sample_fraction: float = None
 ):
     
-    results = {}
-    
-    lat = latitude 
+    lat = latitude
     lon = longitude 
     buffer = buffer_m 
     cloud_thresh = cloud_max or config.CLOUD_PROBABILITY_THRESHOLD
+
+    cache_key = _cache_key(lat, lon, buffer, cloud_thresh, start_date, end_date,
+                           sample_fraction)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         point = ee.Geometry.Point([lon, lat])
         roi = point.buffer(buffer)
+        # The composite is clipped to the circular roi, so reductions and
+        # thumbnails only need its bounding rectangle. Build that node once
+        # instead of re-serializing the many-vertex buffer polygon into
+        # every downstream request.
+        roi_bounds = roi.bounds()
     except Exception as e:
-        raise AnalysisError("Error creando roi: "+ e)
+        raise AnalysisError(f"Error creando roi: {e}") from e
 
     try:
-        s2_collection, s2_count = get_sentinel2_collection(roi, start_date, end_date)
+        s2_collection, s2_count = get_sentinel2_collection_for_point(
+            lat, lon, buffer, start_date, end_date
+        )
         if s2_count == 0:
             raise AnalysisError("Error obteniendo coleccion de imagenes s2, intenta cambiando el rango de tiempo")
 
-        s2_cloudless = get_s2_cloudless_collection(roi)
+        s2_cloudless = get_s2_cloudless_collection_for_point(
+            lat, lon, buffer, start_date, end_date
+        )
     except AnalysisError:
         raise
     except Exception as e:
-        raise AnalysisError("Error obteniendo imagenes del satelite")
+        raise AnalysisError("Error obteniendo imagenes del satelite") from e
     
-    results["image_count"] = s2_count
     try:
         masked_collection = apply_comprehensive_cloud_mask(
             s2_collection,
             s2_cloudless,
-            cloud_threshold= cloud_max or config.CLOUD_PROBABILITY_THRESHOLD
+            cloud_threshold=cloud_thresh
         )
     except Exception as e:
-        raise AnalysisError("Error masking clouds: " + e)
+        raise AnalysisError(f"Error masking clouds: {e}") from e
     
     
     try:
@@ -60,51 +132,66 @@ def analyze_fun(
             method=config.COMPOSITE_METHOD
         )
     except Exception as e:
-        raise AnalysisError("Error creando imagen compuesta: " + e)
+        raise AnalysisError(f"Error creando imagen compuesta: {e}") from e
     
     try:
         composite = composite.clip(roi)
-        results["composite"] = composite
-    
+
         composite_with_indices = calculate_selected_indices(
             composite,
             indices=config.SOIL_INDICES
         )
-        results["composite_with_indices"] = composite_with_indices
     except Exception as e:
-        raise AnalysisError("error calculando indices: " + e)
+        raise AnalysisError(f"error calculando indices: {e}") from e
     # Create bare soil mask
 
     try:
-        bare_soil_mask = create_bare_soil_mask(composite_with_indices)
-        results["bare_soil_mask"] = bare_soil_mask
+        bare_soil_mask = create_bare_soil_mask(composite_with_indices, has_indices=True)
     except Exception as e:
-        raise AnalysisError("error creando mask de suelo: " + e)
+        raise AnalysisError(f"error creando mask de suelo: {e}") from e
     
-    try:
-        stats = get_soil_statistics(
+    # Statistics+histograms and thumbnail URLs are independent server-side
+    # calls, so dispatch them concurrently (the EE client is thread-safe for
+    # independent requests and the high-volume endpoint handles the fan-out).
+    # Statistics and histograms share a single fused reduceRegion round-trip.
+    # Large buffers are tiled so each reduction covers a bounded area and
+    # the tiles run in parallel against the high-volume endpoint. When the
+    # caller asks for sampled statistics, the sampled single-call path
+    # already bounds the work, so tiling is unnecessary.
+    stats_hist_kwargs = {"indices": config.SOIL_INDICES}
+    if sample_fraction:
+        stats_hist_fun = compute_stats_and_histograms
+        stats_hist_kwargs["sample_fraction"] = sample_fraction
+    elif buffer and buffer > _TILED_STATS_BUFFER_M:
+        stats_hist_fun = compute_stats_and_histograms_tiled
+    else:
+        stats_hist_fun = compute_stats_and_histograms
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        f_stats_hist = executor.submit(
+            stats_hist_fun,
             composite_with_indices,
-            roi,
-            indices=config.SOIL_INDICES
+            roi_bounds,
+            **stats_hist_kwargs
         )
-        results["statistics"] = stats
-    except Exception as e:
-        raise AnalysisError("Error obteniendo estadisticas del suelo: "+ e)
-    
-    try:
-        histograms = get_all_indices_histograms(
-            composite_with_indices,
-            roi,
-            indices=config.SOIL_INDICES
+        f_urls = executor.submit(
+            get_all_visualization_urls, composite, roi_bounds, dimensions=600
         )
-        results["histograms"] = histograms
-    except Exception as e:
-        raise AnalysisError("Error obteniendo hisotgramas: " + e)
-    try:
-        image_urls = get_all_visualization_urls(composite, roi, dimensions=600)
-    except Exception as e:
-        raise AnalysisError("error obteniendo urls de imagenes: " + e)
-    
+
+        try:
+            stats, histograms = f_stats_hist.result()
+        except Exception as e:
+            raise AnalysisError(f"Error obteniendo estadisticas e histogramas del suelo: {e}") from e
+
+        try:
+            image_urls = f_urls.result()
+        except Exception as e:
+            raise AnalysisError(f"error obteniendo urls de imagenes: {e}") from e
+
+    # Release the Python-side ee.Image wrappers as soon as the server-side
+    # work has resolved; only the serializable results are returned.
+    del composite_with_indices, composite, masked_collection
+
     results = {
         "metadata": {
             "coordinates": {
@@ -124,4 +211,6 @@ def analyze_fun(
         "histograms": histograms
     }
 
+    _cache_put(cache_key, results)
+
     return results
\ No newline at end of file
@@ -23,7 +23,8 @@ DEFAULT_PROJECT_ID = os.environ.get("GEE_PROJECT", "enginetrial")
 
 def authenticate_with_service_account(
     key_file: str,
-    service_account_email: str = None
+    service_account_email: str = None,
+    high_volume: bool = True
 ) -> bool:
     """
     Authenticate using a service account.
@@ -37,7 +38,8 @@ def authenticate_with_service_account(
     Args:
         key_file: Path to the service account JSON key file.
         service_account_email: Service account email. If None, extracted from key file.
-    
+        high_volume: If True, initialize against the high-volume endpoint.
+
     Returns:
         bool: True if authentication successful.
     """
@@ -53,7 +55,14 @@ def authenticate_with_service_account(
                 key_file=key_file
             )
         
-        ee.Initialize(credentials, project=DEFAULT_PROJECT_ID)
+        if high_volume:
+            ee.Initialize(
+                credentials,
+                project=DEFAULT_PROJECT_ID,
+                opt_url="https://earthengine-highvolume.googleapis.com"
+            )
+        else:
+            ee.Initialize(credentials, project=DEFAULT_PROJECT_ID)
         print(f"✓ Authenticated with service account")
         print(f"  Project: {DEFAULT_PROJECT_ID}")
         return True
@@ -157,18 +166,28 @@ def check_gee_connection() -> bool:
         return False
 
 
-def setup_gee(project_id: str = None, key_file: str = None) -> bool:
+def setup_gee(
+    project_id: str = None,
+    key_file: str = None,
+    high_volume: bool = True
+) -> bool:
     """
     Complete GEE setup: authenticate, initialize, and verify connection.
-    
+
     This is the main function to call at the start of your script.
-    
+
+    By default this initializes against the high-volume endpoint
+    (https://earthengine-highvolume.googleapis.com), which is tuned for
+    many concurrent small requests (getThumbURL, reduceRegion). Callers
+    issuing parallel requests should pair this with a thread/process pool.
+
     Args:
         project_id: Optional cloud project ID.
         key_file: Optional path to service account JSON key file.
                  If provided, uses service account auth.
                  Can also be set via GEE_KEY_FILE environment variable.
-    
+        high_volume: If True (default), use the high-volume endpoint.
+
     Returns:
         bool: True if all steps successful, False otherwise.
     
@@ -193,14 +212,16 @@ def setup_gee(project_id: str = None, key_file: str = None) -> bool:
     if key_file and os.path.exists(key_file):
         # Use service account authentication
         print("Using service account authentication...")
-        if not authenticate_with_service_account(key_file, SERVICE_ACCOUNT_EMAIL):
+        if not authenticate_with_service_account(
+            key_file, SERVICE_ACCOUNT_EMAIL, high_volume=high_volume
+        ):
             return False
     else:
         # Use interactive authentication
         if not authenticate_gee():
             return False
-        
-        if not initialize_gee(project_id or DEFAULT_PROJECT_ID):
+
+        if not initialize_gee(project_id or DEFAULT_PROJECT_ID, high_volume=high_volume):
             return False
     
     if not check_gee_connection():
@@ -8,6 +8,10 @@ from typing import Tuple
 
 import config
 
+# Hot config value bound once at import; per-image mask closures would
+# otherwise pay a module attribute lookup on every call
+_CLOUD_PROBABILITY_THRESHOLD = config.CLOUD_PROBABILITY_THRESHOLD
+
 
 def mask_s2_clouds_qa(image: ee.Image) -> ee.Image:
     """
@@ -23,17 +27,13 @@ def mask_s2_clouds_qa(image: ee.Image) -> ee.Image:
         ee.Image: Image with clouds masked.
     """
     qa = image.select("QA60")
-    
-    # Bits 10 and 11 are clouds and cirrus
-    cloud_bit_mask = 1 << 10
-    cirrus_bit_mask = 1 << 11
-    
-    # Both flags should be zero for clear conditions
-    mask = (
-        qa.bitwiseAnd(cloud_bit_mask).eq(0)
-        .And(qa.bitwiseAnd(cirrus_bit_mask).eq(0))
-    )
-    
+
+    # Bits 10 and 11 are clouds and cirrus; both must be zero for clear
+    # conditions, which is equivalent to one combined bit test
+    cloud_cirrus_mask = (1 << 10) | (1 << 11)
+
+    mask = qa.bitwiseAnd(cloud_cirrus_mask).eq(0)
+
     return image.updateMask(mask)
 
 
@@ -58,14 +58,11 @@ def mask_s2_clouds_scl(image: ee.Image) -> ee.Image:
     # 9 = Cloud High Probability
     # 10 = Thin Cirrus
     # 11 = Snow/Ice (optional, may want to keep)
-    
-    mask = (
-        scl.neq(3)   # Not cloud shadow
-        .And(scl.neq(8))   # Not cloud medium
-        .And(scl.neq(9))   # Not cloud high
-        .And(scl.neq(10))  # Not cirrus
-    )
-    
+
+    # remap lowers to a single lookup op per pixel instead of four
+    # comparisons chained with three logical ands
+    mask = scl.remap([3, 8, 9, 10], [1, 1, 1, 1], 0).eq(0)
+
     return image.updateMask(mask)
 
 
@@ -86,17 +83,29 @@ def add_cloud_probability(
     Returns:
         ee.ImageCollection: S2 collection with probability band added.
     """
+    # Prune the secondary to the primary's time window and footprint
+    # before joining, so the join considers m << M candidates when the
+    # primary is already a small filtered subset
+    dr = s2_collection.reduceColumns(ee.Reducer.minMax(), ["system:time_start"])
+    min_t = ee.Number(dr.get("min")).subtract(1)
+    max_t = ee.Number(dr.get("max")).add(1)
+    cloudless_pruned = (
+        cloudless_collection
+        .filterDate(ee.Date(min_t), ee.Date(max_t))
+        .filterBounds(s2_collection.geometry())
+    )
+
     # Define join condition: same system:index
     join_filter = ee.Filter.equals(
         leftField="system:index",
         rightField="system:index"
     )
-    
+
     # Join the collections
     joined = ee.ImageCollection(
         ee.Join.saveFirst("cloud_prob").apply(
             primary=s2_collection,
-            secondary=cloudless_collection,
+            secondary=cloudless_pruned,
             condition=join_filter
         )
     )
@@ -128,8 +137,8 @@ def mask_s2_clouds_probability(
     Returns:
         ee.Image: Image with clouds masked.
     """
-    thresh = threshold or config.CLOUD_PROBABILITY_THRESHOLD
-    
+    thresh = threshold or _CLOUD_PROBABILITY_THRESHOLD
+
     cloud_prob = image.select("probability")
     mask = cloud_prob.lt(thresh)
     
@@ -187,20 +196,19 @@ def mask_cloud_shadows(
         .mask()
     )
     
-    # Shadow mask: dark pixels within projected shadow zone
-    is_shadow = dark_pixels.And(projected_shadows)
-    
-    # Combined mask: not cloud and not shadow
-    clear_mask = is_cloud.Not().And(is_shadow.Not())
-    
-    return image.updateMask(clear_mask)
+    # Clear iff neither cloud nor (dark pixel within the projected shadow
+    # zone); De Morgan folds the two Nots and the And into a single Or+Not
+    bad = is_cloud.Or(dark_pixels.And(projected_shadows))
+
+    return image.updateMask(bad.Not())
 
 
 def apply_comprehensive_cloud_mask(
     s2_collection: ee.ImageCollection,
     cloudless_collection: ee.ImageCollection,
     cloud_threshold: int = None,
-    mask_shadows: bool = True
+    mask_shadows: bool = True,
+    skip_scl_if_prob_covers: bool = False
 ) -> ee.ImageCollection:
     """
     Apply comprehensive cloud and shadow masking to collection.
@@ -210,31 +218,59 @@ def apply_comprehensive_cloud_mask(
     2. Masks clouds using probability threshold
     3. Optionally masks cloud shadows
     4. Also applies SCL mask for extra coverage
-    
+
+    The whole step is deferred: masking happens through collection.map
+    with server-side functions and no getInfo round-trips, so the graph
+    only evaluates when a downstream reducer or export runs.
+
     Args:
         s2_collection: Sentinel-2 image collection.
         cloudless_collection: s2cloudless probability collection.
         cloud_threshold: Cloud probability threshold.
                         Defaults to config.CLOUD_PROBABILITY_THRESHOLD.
         mask_shadows: Whether to also mask cloud shadows.
-    
+        skip_scl_if_prob_covers: Skip the SCL mask on images where the
+                        probability mask already leaves >95% of the
+                        footprint clear. Saves the SCL lookup on easy
+                        scenes, at the cost of a coarse per-image
+                        coverage reduction.
+
     Returns:
         ee.ImageCollection: Collection with clouds masked.
     """
-    thresh = cloud_threshold or config.CLOUD_PROBABILITY_THRESHOLD
+    thresh = cloud_threshold or _CLOUD_PROBABILITY_THRESHOLD
     
     # Add cloud probability band
     collection_with_prob = add_cloud_probability(s2_collection, cloudless_collection)
     
     def apply_masks(image):
-        # Apply probability-based cloud mask
-        masked = mask_s2_clouds_probability(image, thresh)
-        
-        # Apply SCL mask for additional coverage
-        masked = mask_s2_clouds_scl(masked)
-        
-        return masked
-    
+        # Fuse the probability and SCL masks into one boolean image so
+        # each image carries a single updateMask node instead of two
+        prob_mask = image.select("probability").lt(thresh)
+
+        # Single-lookup SCL test: shadow (3), cloud medium/high (8, 9),
+        # cirrus (10)
+        scl_mask = image.select("SCL").remap([3, 8, 9, 10], [1, 1, 1, 1], 0).eq(0)
+
+        if not skip_scl_if_prob_covers:
+            return image.updateMask(prob_mask.And(scl_mask))
+
+        # Mostly-clear scenes (per a coarse mean of the probability mask)
+        # skip the SCL lookup entirely
+        cover = prob_mask.reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=image.geometry(),
+            scale=100,
+            maxPixels=1e9,
+            bestEffort=True
+        ).values().get(0)
+
+        return ee.Image(ee.Algorithms.If(
+            ee.Number(cover).gt(0.95),
+            image.updateMask(prob_mask),
+            image.updateMask(prob_mask.And(scl_mask))
+        ))
+
     masked_collection = collection_with_prob.map(apply_masks)
     
     print(f"✓ Applied cloud masking (threshold: {thresh}%)")
@@ -249,7 +285,11 @@ def get_cloud_free_pixel_percentage(
 ) -> float:
     """
     Calculate percentage of cloud-free pixels in an image.
-    
+
+    Blocks on one getInfo per call; for many images prefer
+    get_cloud_free_percentages, which batches the whole collection into
+    a single round-trip.
+
     Args:
         image: Masked image (clouds should be masked out).
         roi: Region of interest.
@@ -258,11 +298,11 @@ def get_cloud_free_pixel_percentage(
     Returns:
         float: Percentage of cloud-free pixels (0-100).
     """
-    # Count valid (unmasked) pixels
+    # Count valid (unmasked) pixels via the mask band, one reduction
     valid_pixels = (
-        image.select(0)
+        image.mask().select(0)
         .reduceRegion(
-            reducer=ee.Reducer.count(),
+            reducer=ee.Reducer.sum(),
             geometry=roi,
             scale=scale,
             maxPixels=1e9
@@ -270,7 +310,7 @@ def get_cloud_free_pixel_percentage(
         .values()
         .get(0)
     )
-    
+
     # Count total pixels in region
     total_pixels = (
         ee.Image.constant(1)
@@ -283,7 +323,7 @@ def get_cloud_free_pixel_percentage(
         .values()
         .get(0)
     )
-    
+
     percentage = (
         ee.Number(valid_pixels)
         .divide(ee.Number(total_pixels))
@@ -294,6 +334,70 @@ def get_cloud_free_pixel_percentage(
     return percentage
 
 
+def _tag_clear_percent(
+    collection: ee.ImageCollection,
+    roi: ee.Geometry,
+    scale: int
+) -> ee.ImageCollection:
+    """
+    Set a 'clear_pixel_percent' property on every image, fully deferred.
+
+    The total-pixel denominator is invariant across images, so it is
+    built once outside the map instead of re-reducing a constant per
+    image. The reducers are hoisted too, so every image shares one graph
+    node apiece. (They can't live at module scope: constructing an
+    ee.Reducer needs ee.Initialize, which runs after import.)
+    """
+    sum_reducer = ee.Reducer.sum()
+    total = ee.Number(
+        ee.Image.constant(1).reduceRegion(
+            reducer=ee.Reducer.count(),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        ).values().get(0)
+    )
+
+    def add_clear_percent(image):
+        # Summing the mask band counts unmasked pixels in one reduction
+        valid = image.mask().select(0).reduceRegion(
+            reducer=sum_reducer,
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        ).values().get(0)
+
+        clear_pct = ee.Number(valid).divide(total).multiply(100)
+
+        return image.set("clear_pixel_percent", clear_pct)
+
+    return collection.map(add_clear_percent)
+
+
+def get_cloud_free_percentages(
+    collection: ee.ImageCollection,
+    roi: ee.Geometry,
+    scale: int = 100
+) -> list:
+    """
+    Get clear-pixel percentages for every image in one round-trip.
+
+    Calling get_cloud_free_pixel_percentage per image costs one blocking
+    getInfo each; this batches the whole collection into a single
+    aggregate_array fetch.
+
+    Args:
+        collection: Masked image collection.
+        roi: Region of interest.
+        scale: Scale for calculation in meters.
+
+    Returns:
+        list: Clear-pixel percentage (0-100) per image, in collection order.
+    """
+    tagged = _tag_clear_percent(collection, roi, scale)
+    return tagged.aggregate_array("clear_pixel_percent").getInfo()
+
+
 def filter_by_clear_pixels(
     collection: ee.ImageCollection,
     roi: ee.Geometry,
@@ -302,39 +406,20 @@ def filter_by_clear_pixels(
 ) -> ee.ImageCollection:
     """
     Filter collection to only include images with sufficient clear pixels.
-    
+
     Args:
         collection: Masked image collection.
         roi: Region of interest.
         min_clear_percent: Minimum percentage of clear pixels required.
         scale: Scale for calculation in meters.
-    
+
     Returns:
         ee.ImageCollection: Filtered collection.
     """
-    def add_clear_percent(image):
-        valid = image.select(0).reduceRegion(
-            reducer=ee.Reducer.count(),
-            geometry=roi,
-            scale=scale,
-            maxPixels=1e9
-        ).values().get(0)
-        
-        total = ee.Image.constant(1).reduceRegion(
-            reducer=ee.Reducer.count(),
-            geometry=roi,
-            scale=scale,
-            maxPixels=1e9
-        ).values().get(0)
-        
-        clear_pct = ee.Number(valid).divide(ee.Number(total)).multiply(100)
-        
-        return image.set("clear_pixel_percent", clear_pct)
-    
-    collection_with_stats = collection.map(add_clear_percent)
-    
+    collection_with_stats = _tag_clear_percent(collection, roi, scale)
+
     filtered = collection_with_stats.filter(
         ee.Filter.gte("clear_pixel_percent", min_clear_percent)
     )
-    
+
     return filtered
\ No newline at end of file
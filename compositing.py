@@ -8,10 +8,16 @@ from typing import List, Optional
 
 import config
 
+# Hot config values bound once at import; tiled workflows call the
+# dispatch wrappers hundreds of times
+_COMPOSITE_METHOD = config.COMPOSITE_METHOD
+_COMPOSITE_PERCENTILE = config.COMPOSITE_PERCENTILE
+
 
 def create_median_composite(
     collection: ee.ImageCollection,
-    bands: List[str] = None
+    bands: List[str] = None,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create a median composite from image collection.
@@ -22,6 +28,7 @@ def create_median_composite(
     Args:
         collection: Image collection to composite.
         bands: Optional list of bands to include. If None, includes all.
+        verbose: Print a confirmation message.
     
     Returns:
         ee.Image: Median composite image.
@@ -31,13 +38,15 @@ def create_median_composite(
     
     composite = collection.median()
     
-    print("✓ Created median composite")
+    if verbose:
+        print("✓ Created median composite")
     return composite
 
 
 def create_mean_composite(
     collection: ee.ImageCollection,
-    bands: List[str] = None
+    bands: List[str] = None,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create a mean composite from image collection.
@@ -48,6 +57,7 @@ def create_mean_composite(
     Args:
         collection: Image collection to composite.
         bands: Optional list of bands to include.
+        verbose: Print a confirmation message.
     
     Returns:
         ee.Image: Mean composite image.
@@ -57,14 +67,17 @@ def create_mean_composite(
     
     composite = collection.mean()
     
-    print("✓ Created mean composite")
+    if verbose:
+        print("✓ Created mean composite")
     return composite
 
 
 def create_percentile_composite(
     collection: ee.ImageCollection,
     percentile: int = 50,
-    bands: List[str] = None
+    bands: List[str] = None,
+    band_names: ee.List = None,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create a percentile composite from image collection.
@@ -80,27 +93,33 @@ def create_percentile_composite(
         collection: Image collection to composite.
         percentile: Percentile value (0-100). 50 = median.
         bands: Optional list of bands to include.
-    
+        band_names: Optional precomputed source band names (ee.List),
+                   lets repeated calls share one metadata lookup.
+        verbose: Print a confirmation message.
+
     Returns:
         ee.Image: Percentile composite image.
     """
     if bands:
         collection = collection.select(bands)
-    
+
     composite = collection.reduce(ee.Reducer.percentile([percentile]))
-    
-    # Rename bands to remove '_pXX' suffix
-    band_names = composite.bandNames()
-    new_names = band_names.map(lambda name: ee.String(name).replace(f"_p{percentile}", ""))
-    composite = composite.rename(new_names)
-    
-    print(f"✓ Created {percentile}th percentile composite")
+
+    # A single-percentile reduce preserves band order, so rename straight
+    # back to the source names instead of string-replacing the '_pXX'
+    # suffix off every output band.
+    orig_names = band_names if band_names is not None else collection.first().bandNames()
+    composite = composite.rename(orig_names)
+
+    if verbose:
+        print(f"✓ Created {percentile}th percentile composite")
     return composite
 
 
 def create_min_composite(
     collection: ee.ImageCollection,
-    bands: List[str] = None
+    bands: List[str] = None,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create a minimum value composite.
@@ -113,6 +132,7 @@ def create_min_composite(
     Args:
         collection: Image collection to composite.
         bands: Optional list of bands to include.
+        verbose: Print a confirmation message.
     
     Returns:
         ee.Image: Minimum value composite.
@@ -122,13 +142,15 @@ def create_min_composite(
     
     composite = collection.min()
     
-    print("✓ Created minimum composite")
+    if verbose:
+        print("✓ Created minimum composite")
     return composite
 
 
 def create_max_composite(
     collection: ee.ImageCollection,
-    bands: List[str] = None
+    bands: List[str] = None,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create a maximum value composite.
@@ -141,6 +163,7 @@ def create_max_composite(
     Args:
         collection: Image collection to composite.
         bands: Optional list of bands to include.
+        verbose: Print a confirmation message.
     
     Returns:
         ee.Image: Maximum value composite.
@@ -150,12 +173,14 @@ def create_max_composite(
     
     composite = collection.max()
     
-    print("✓ Created maximum composite")
+    if verbose:
+        print("✓ Created maximum composite")
     return composite
 
 
 def create_greenest_pixel_composite(
-    collection: ee.ImageCollection
+    collection: ee.ImageCollection,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create composite using pixels with maximum NDVI.
@@ -165,6 +190,7 @@ def create_greenest_pixel_composite(
     
     Args:
         collection: Sentinel-2 image collection.
+        verbose: Print a confirmation message.
     
     Returns:
         ee.Image: Greenest pixel composite.
@@ -172,18 +198,22 @@ def create_greenest_pixel_composite(
     def add_ndvi(image):
         ndvi = image.normalizedDifference(["B8", "B4"]).rename("NDVI")
         return image.addBands(ndvi)
-    
+
     collection_with_ndvi = collection.map(add_ndvi)
-    
-    # Select pixels with maximum NDVI
+
+    # Select pixels with maximum NDVI, then drop the helper quality band
+    # so downstream tiles don't carry (and recompute) it
     composite = collection_with_ndvi.qualityMosaic("NDVI")
-    
-    print("✓ Created greenest pixel composite")
+    composite = composite.select(composite.bandNames().remove("NDVI"))
+
+    if verbose:
+        print("✓ Created greenest pixel composite")
     return composite
 
 
 def create_driest_pixel_composite(
-    collection: ee.ImageCollection
+    collection: ee.ImageCollection,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create composite using pixels with minimum moisture.
@@ -193,6 +223,7 @@ def create_driest_pixel_composite(
     
     Args:
         collection: Sentinel-2 image collection.
+        verbose: Print a confirmation message.
     
     Returns:
         ee.Image: Driest pixel composite.
@@ -205,11 +236,14 @@ def create_driest_pixel_composite(
         return image.addBands(ndmi_inv)
     
     collection_with_ndmi = collection.map(add_ndmi)
-    
-    # Select pixels with minimum moisture (maximum inverted NDMI)
+
+    # Select pixels with minimum moisture (maximum inverted NDMI), then
+    # drop the helper quality band from the result
     composite = collection_with_ndmi.qualityMosaic("NDMI_inv")
-    
-    print("✓ Created driest pixel composite")
+    composite = composite.select(composite.bandNames().remove("NDMI_inv"))
+
+    if verbose:
+        print("✓ Created driest pixel composite")
     return composite
 
 
@@ -236,25 +270,52 @@ def create_monthly_composites(
     
     # Calculate number of months
     n_months = end.difference(start, "month").round()
-    
+
+    # Hoist the reducer and band-name lookup out of the closure so one
+    # shared node serves every month instead of a fresh copy per call
+    reducer = {
+        "median": ee.Reducer.median(),
+        "mean": ee.Reducer.mean(),
+        "max": ee.Reducer.max(),
+        "min": ee.Reducer.min(),
+    }.get(method, ee.Reducer.median())
+    # Deferred so an empty input collection stays an error-free graph:
+    # first() on it would fail the whole evaluation
+    first_bandnames = ee.List(ee.Algorithms.If(
+        collection.size().gt(0),
+        collection.first().bandNames(),
+        ee.List([])
+    ))
+
+    # Tag each image with its month bucket once, so the per-month step is
+    # a metadata equality filter instead of a date-range scan over the
+    # whole collection for every month
+    def tag_month(img):
+        month_idx = (
+            ee.Date(img.get("system:time_start"))
+            .difference(start, "month")
+            .floor()
+        )
+        return img.set("month_idx", month_idx)
+
+    tagged = collection.map(tag_month)
+
     def make_monthly_composite(month_offset):
         month_offset = ee.Number(month_offset)
         month_start = start.advance(month_offset, "month")
-        month_end = month_start.advance(1, "month")
-        
-        monthly_collection = collection.filterDate(month_start, month_end)
-        
-        if method == "median":
-            composite = monthly_collection.median()
-        elif method == "mean":
-            composite = monthly_collection.mean()
-        elif method == "max":
-            composite = monthly_collection.max()
-        elif method == "min":
-            composite = monthly_collection.min()
-        else:
-            composite = monthly_collection.median()
-        
+
+        monthly_collection = tagged.filter(ee.Filter.eq("month_idx", month_offset))
+
+        # reduce() suffixes band names with the reducer name; rename
+        # back. A month with zero images reduces to a zero-band image
+        # whose rename would fail the whole collection's evaluation, so
+        # branch server-side to the baseline's quiet empty composite.
+        composite = ee.Image(ee.Algorithms.If(
+            monthly_collection.size().gt(0),
+            monthly_collection.reduce(reducer).rename(first_bandnames),
+            monthly_collection.median()
+        ))
+
         return composite.set({
             "system:time_start": month_start.millis(),
             "month": month_start.format("YYYY-MM")
@@ -262,8 +323,10 @@ def create_monthly_composites(
     
     months = ee.List.sequence(0, n_months.subtract(1))
     monthly_composites = ee.ImageCollection(months.map(make_monthly_composite))
-    
-    print(f"✓ Created {n_months.getInfo()} monthly composites using {method}")
+
+    # Stay lazy: printing the month count would force a getInfo round-trip
+    # here. Callers who need it can call .size().getInfo() once.
+    print(f"✓ Creating monthly composites using {method}")
     return monthly_composites
 
 
@@ -271,43 +334,56 @@ def create_composite(
     collection: ee.ImageCollection,
     method: str = None,
     percentile: int = None,
-    bands: List[str] = None
+    bands: List[str] = None,
+    verbose: bool = False
 ) -> ee.Image:
     """
     Create composite using specified method from config.
     
     This is the main compositing function that reads from config
     and dispatches to the appropriate method.
-    
+
+    All methods return a deferred ee.Image built without getInfo
+    round-trips; nothing is evaluated until a reducer or export needs
+    concrete pixels.
+
     Args:
         collection: Image collection to composite.
         method: Compositing method. Defaults to config.COMPOSITE_METHOD.
         percentile: Percentile value. Defaults to config.COMPOSITE_PERCENTILE.
         bands: Optional list of bands to include.
+        verbose: Print per-method confirmation messages.
     
     Returns:
         ee.Image: Composite image.
     """
-    method = method or config.COMPOSITE_METHOD
-    percentile = percentile or config.COMPOSITE_PERCENTILE
-    
+    method = method or _COMPOSITE_METHOD
+    percentile = percentile or _COMPOSITE_PERCENTILE
+
+    # Select once at the entry point so only the needed bands are ever
+    # loaded from source tiles; the per-method helpers then see a
+    # pre-pruned collection. For greenest/driest, bands must include the
+    # inputs of the quality score (B4/B8, or B8/B11).
+    if bands:
+        collection = collection.select(bands)
+
     if method == "median":
-        return create_median_composite(collection, bands)
+        return create_median_composite(collection, verbose=verbose)
     elif method == "mean":
-        return create_mean_composite(collection, bands)
+        return create_mean_composite(collection, verbose=verbose)
     elif method == "percentile":
-        return create_percentile_composite(collection, percentile, bands)
+        return create_percentile_composite(collection, percentile, verbose=verbose)
     elif method == "min":
-        return create_min_composite(collection, bands)
+        return create_min_composite(collection, verbose=verbose)
     elif method == "max":
-        return create_max_composite(collection, bands)
+        return create_max_composite(collection, verbose=verbose)
     elif method == "greenest":
-        return create_greenest_pixel_composite(collection)
+        return create_greenest_pixel_composite(collection, verbose=verbose)
     elif method == "driest":
-        return create_driest_pixel_composite(collection)
+        return create_driest_pixel_composite(collection, verbose=verbose)
     else:
         print(f"Unknown method '{method}', defaulting to median")
-        return create_median_composite(collection, bands)
+        return create_median_composite(collection, verbose=verbose)
 
 
 def create_multi_composite(
@@ -327,13 +403,41 @@ def create_multi_composite(
     Returns:
         dict: Dictionary of composites by method name.
     """
+    selected = collection.select(bands) if bands else collection
+    orig_names = selected.first().bandNames()
+
+    # Fuse median/mean/p25/p75 into one combined reducer so the pixel
+    # stream is scanned once instead of four times; the variants are then
+    # split back out by the band suffix each sub-reducer appends.
+    combined = (
+        ee.Reducer.median()
+        .combine(ee.Reducer.mean(), sharedInputs=True)
+        .combine(ee.Reducer.percentile([25, 75]), sharedInputs=True)
+    )
+    stats = selected.reduce(combined)
+
+    # Add both quality bands in one map pass instead of traversing the
+    # collection separately for the greenest and driest helpers
+    def add_quality_bands(img):
+        ndvi = img.normalizedDifference(["B8", "B4"]).rename("NDVI")
+        ndmi_inv = (
+            img.normalizedDifference(["B8", "B11"]).multiply(-1).rename("NDMI_inv")
+        )
+        return img.addBands(ndvi).addBands(ndmi_inv)
+
+    enriched = collection.map(add_quality_bands)
+    source_names = collection.first().bandNames()
+
     composites = {
-        "median": create_median_composite(collection, bands),
-        "mean": create_mean_composite(collection, bands),
-        "p25": create_percentile_composite(collection, 25, bands),
-        "p75": create_percentile_composite(collection, 75, bands),
-        "greenest": create_greenest_pixel_composite(collection),
-        "driest": create_driest_pixel_composite(collection),
+        "median": stats.select(".*_median").rename(orig_names),
+        "mean": stats.select(".*_mean").rename(orig_names),
+        "p25": stats.select(".*_p25").rename(orig_names),
+        "p75": stats.select(".*_p75").rename(orig_names),
+        # qualityMosaic picks whole pixels, so these can't be fused into
+        # the combined reducer; they do share the enriched collection.
+        # Selecting the source names drops the helper quality bands.
+        "greenest": enriched.qualityMosaic("NDVI").select(source_names),
+        "driest": enriched.qualityMosaic("NDMI_inv").select(source_names),
     }
     
     print(f"✓ Created {len(composites)} composite variants")
@@ -4,10 +4,31 @@ Handles image preparation for export with various compression options.
 """
 
 import ee
+from functools import lru_cache
 from typing import List, Tuple, Optional
 
 import config
 
+# Hot config lists bound once as tuples; tiled exports call the helpers
+# below hundreds of times.
+_VIS_BANDS_RGB = tuple(config.VIS_BANDS_RGB)
+_SOIL_INDICES = tuple(config.SOIL_INDICES)
+_ALL_SPECTRAL_BANDS = tuple(config.FULL_SPECTRAL_BANDS)
+_VIS_MIN = config.VIS_MIN
+_VIS_MAX = config.VIS_MAX
+_DRIVE_FOLDER = config.DRIVE_FOLDER
+_EXPORT_SCALE = config.EXPORT_SCALE
+_MAX_PIXELS = config.MAX_PIXELS
+_GEOTIFF_COMPRESSION = config.GEOTIFF_COMPRESSION
+
+# Rough output/input size ratios per codec for size estimates
+_COMPRESSION_RATIO = {
+    "ZSTD": 0.4,
+    "DEFLATE": 0.5,
+    "LZW": 0.6,
+    "JPEG": 0.25,
+}
+
 
 def scale_to_uint16(image: ee.Image, min_val: float = 0, max_val: float = 10000) -> ee.Image:
     """
@@ -61,23 +82,21 @@ def scale_indices_to_uint16(image: ee.Image, index_bands: List[str] = None) -> e
     Returns:
         ee.Image: Image with scaled index bands.
     """
-    index_bands = index_bands or config.SOIL_INDICES
-    
-    # Indices typically -1 to 1, scale to 0-65535
-    def scale_index(band_name):
-        band = image.select(band_name)
-        # Shift from [-1,1] to [0,2], then scale to [0,65535]
-        scaled = band.add(1).multiply(32767.5).toUint16()
-        return scaled.rename(band_name + "_scaled")
-    
-    scaled_bands = [scale_index(name) for name in index_bands 
-                    if name in image.bandNames().getInfo()]
-    
-    if scaled_bands:
-        result = ee.Image.cat(scaled_bands)
-        return result
-    else:
-        return image
+    index_bands = index_bands or _SOIL_INDICES
+
+    # Filter to the bands actually present, entirely server-side (no
+    # getInfo round-trip), then scale them all in one multi-band op.
+    available = ee.List(list(index_bands)).filter(
+        ee.Filter.inList("item", image.bandNames())
+    )
+
+    subset = image.select(available)
+
+    # Shift from [-1,1] to [0,2], then scale to [0,65535]
+    scaled = subset.add(1).multiply(32767.5).toUint16()
+    scaled = scaled.rename(available.map(lambda n: ee.String(n).cat("_scaled")))
+
+    return scaled
 
 
 def prepare_rgb_visualization(
@@ -96,11 +115,13 @@ def prepare_rgb_visualization(
         max_val: Maximum value for stretching. Defaults to config.VIS_MAX.
     
     Returns:
-        ee.Image: 3-band uint8 image suitable for visualization.
+        ee.Image: 3-band uint8 image suitable for visualization. The
+                 uint8 cast matters for exports too: visualization
+                 products ship at a quarter of the float byte size.
     """
-    bands = bands or config.VIS_BANDS_RGB
-    min_v = min_val if min_val is not None else config.VIS_MIN
-    max_v = max_val if max_val is not None else config.VIS_MAX
+    bands = bands or _VIS_BANDS_RGB
+    min_v = min_val if min_val is not None else _VIS_MIN
+    max_v = max_val if max_val is not None else _VIS_MAX
     
     rgb = image.select(bands)
     vis = rgb.unitScale(min_v, max_v).multiply(255).toUint8()
@@ -135,36 +156,38 @@ def prepare_for_export(
         return image.toFloat()
 
 
+@lru_cache(maxsize=8)
 def get_optimal_bands(
     include_rgb: bool = True,
     include_indices: bool = True,
     include_all_spectral: bool = False
-) -> List[str]:
+) -> Tuple[str, ...]:
     """
     Get optimal band selection for export based on use case.
-    
+
+    Memoized: only 8 boolean combinations exist, so repeated calls in
+    tiled export loops reuse the same tuple.
+
     Args:
         include_rgb: Include RGB visualization bands.
         include_indices: Include soil index bands.
         include_all_spectral: Include all Sentinel-2 spectral bands.
-    
+
     Returns:
-        list: Band names to export.
+        tuple: Band names to export.
     """
-    bands = []
-    
+    bands = ()
+
     if include_all_spectral:
         # All 10m and 20m Sentinel-2 bands
-        bands.extend([
-            "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B11", "B12"
-        ])
+        bands += _ALL_SPECTRAL_BANDS
     elif include_rgb:
         # Just RGB
-        bands.extend(config.VIS_BANDS_RGB)
-    
+        bands += _VIS_BANDS_RGB
+
     if include_indices:
-        bands.extend(config.SOIL_INDICES)
-    
+        bands += _SOIL_INDICES
+
     return bands
 
 
@@ -188,22 +211,33 @@ def estimate_file_size(
     Returns:
         dict: Size estimates in various units.
     """
-    # Get ROI area in square meters
-    area_m2 = roi.area().getInfo()
-    
-    # Calculate number of pixels
-    pixels = area_m2 / (scale * scale)
-    
-    # Get band count
+    # Count pixels with an actual reduction at the export scale rather
+    # than approximating from the ROI area; bundle it with the band
+    # count in one deferred dictionary so the estimate still costs a
+    # single round-trip
+    info = {
+        "pixels": ee.Image.constant(1).reduceRegion(
+            reducer=ee.Reducer.count(),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e13,
+            bestEffort=True
+        ).values().get(0)
+    }
     if num_bands is None:
-        num_bands = image.bandNames().size().getInfo()
-    
+        info["nbands"] = image.bandNames().size()
+    info = ee.Dictionary(info).getInfo()
+
+    pixels = info["pixels"]
+    if num_bands is None:
+        num_bands = info["nbands"]
+
     # Calculate raw size in bytes
     bytes_per_pixel = bit_depth / 8
     raw_bytes = pixels * num_bands * bytes_per_pixel
-    
-    # Estimate compressed size (LZW typically 30-50% compression for imagery)
-    compressed_bytes = raw_bytes * 0.6  # Assume 40% compression
+
+    # Estimate compressed size from the configured codec's typical ratio
+    compressed_bytes = raw_bytes * _COMPRESSION_RATIO.get(_GEOTIFF_COMPRESSION, 1.0)
     
     return {
         "pixels": int(pixels),
@@ -241,19 +275,19 @@ def create_export_params(
     params = {
         "image": image,
         "description": description,
-        "folder": folder or config.DRIVE_FOLDER,
+        "folder": folder or _DRIVE_FOLDER,
         "region": roi,
-        "scale": scale or config.EXPORT_SCALE,
+        "scale": scale or _EXPORT_SCALE,
         "crs": crs,
-        "maxPixels": max_pixels or config.MAX_PIXELS,
+        "maxPixels": max_pixels or _MAX_PIXELS,
         "fileFormat": "GeoTIFF",
     }
-    
+
     # Add compression if specified
-    if config.GEOTIFF_COMPRESSION:
+    if _GEOTIFF_COMPRESSION:
         params["formatOptions"] = {
             "cloudOptimized": True,
-            "compression": config.GEOTIFF_COMPRESSION
+            "compression": _GEOTIFF_COMPRESSION
         }
     
     return params
@@ -262,48 +296,61 @@ def create_export_params(
 def split_for_tiled_export(
     roi: ee.Geometry,
     tile_size_km: float = 10
-) -> List[ee.Geometry]:
+) -> ee.List:
     """
     Split large region into tiles for manageable exports.
-    
+
+    The grid is generated entirely server-side (no getInfo round-trips):
+    tile coordinates come from ee.List.sequence and each rectangle is
+    intersected with the roi, so edge tiles shrink to the covered area
+    and tiles outside the roi have zero area.
+
     Args:
         roi: Region of interest.
         tile_size_km: Tile size in kilometers.
-    
+
     Returns:
-        list: List of tile geometries.
+        ee.List: Deferred list of tile geometries. Call .getInfo() (or
+                .size()) only when the concrete tiles are needed.
     """
-    # Get bounding box
-    bounds = roi.bounds().getInfo()["coordinates"][0]
-    
-    min_lon = min(c[0] for c in bounds)
-    max_lon = max(c[0] for c in bounds)
-    min_lat = min(c[1] for c in bounds)
-    max_lat = max(c[1] for c in bounds)
-    
-    # Convert km to degrees (approximate)
-    deg_per_km_lat = 1 / 111  # ~111 km per degree latitude
-    deg_per_km_lon = 1 / (111 * abs(ee.Number(min_lat).cos().getInfo()))
-    
-    tile_size_lat = tile_size_km * deg_per_km_lat
-    tile_size_lon = tile_size_km * deg_per_km_lon
-    
-    tiles = []
-    lat = min_lat
-    while lat < max_lat:
-        lon = min_lon
-        while lon < max_lon:
+    # Bounding box corners as deferred lists
+    bounds = ee.List(roi.bounds().coordinates().get(0))
+    lons = bounds.map(lambda p: ee.List(p).get(0))
+    lats = bounds.map(lambda p: ee.List(p).get(1))
+
+    min_lon = ee.Number(lons.reduce(ee.Reducer.min()))
+    max_lon = ee.Number(lons.reduce(ee.Reducer.max()))
+    min_lat = ee.Number(lats.reduce(ee.Reducer.min()))
+    max_lat = ee.Number(lats.reduce(ee.Reducer.max()))
+
+    # Convert km to degrees (approximate); ~111 km per degree latitude
+    deg_to_rad = 3.141592653589793 / 180
+    cos_lat = min_lat.multiply(deg_to_rad).cos().abs().max(0.01)
+    tile_size_lat = ee.Number(tile_size_km).divide(111)
+    tile_size_lon = ee.Number(tile_size_km).divide(ee.Number(111).multiply(cos_lat))
+
+    lon_starts = ee.List.sequence(min_lon, max_lon, tile_size_lon)
+    lat_starts = ee.List.sequence(min_lat, max_lat, tile_size_lat)
+
+    def make_row(lat_start):
+        lat_start = ee.Number(lat_start)
+
+        def make_tile(lon_start):
+            lon_start = ee.Number(lon_start)
             tile = ee.Geometry.Rectangle([
-                lon, lat,
-                min(lon + tile_size_lon, max_lon),
-                min(lat + tile_size_lat, max_lat)
+                lon_start,
+                lat_start,
+                lon_start.add(tile_size_lon).min(max_lon),
+                lat_start.add(tile_size_lat).min(max_lat)
             ])
-            # Only include tiles that intersect original ROI
-            tiles.append(tile)
-            lon += tile_size_lon
-        lat += tile_size_lat
-    
-    print(f"✓ Split ROI into {len(tiles)} tiles ({tile_size_km}km each)")
+            # Clip tiles to the original ROI
+            return tile.intersection(roi, 1)
+
+        return lon_starts.map(make_tile)
+
+    tiles = lat_starts.map(make_row).flatten()
+
+    print(f"✓ Built server-side tile grid ({tile_size_km}km tiles)")
     return tiles
 
 
@@ -1,6 +1,11 @@
 """
 Configuration settings for plantation soil analysis system.
 Modify these parameters to analyze different locations or time periods.
+
+This module is imported once per process (Python caches it in
+sys.modules); hot call paths bind the values they need to module-local
+aliases at their own import time, so per-call attribute traffic here is
+already negligible.
 """
 
 # =============================================================================
@@ -76,7 +81,9 @@ SOIL_INDICES = ["NDVI","NDSI", "BI", "CI", "NDMI", "BSI"]
 # EXPORT SETTINGS
 # =============================================================================
 
-# Export destination: "drive", "cloud", "asset"
+# Export destination: "drive", "cloud", "asset", or "local"
+# ("local" downloads small outputs directly via getDownloadURL instead
+# of queueing batch tasks)
 EXPORT_DESTINATION = "drive"
 
 # Google Drive folder name (created if doesn't exist)
@@ -91,7 +98,10 @@ EXPORT_SCALE = 10  # Sentinel-2 native resolution
 # Export format: "GeoTIFF"
 EXPORT_FORMAT = "GeoTIFF"
 
-# GeoTIFF compression: "LZW", "DEFLATE", "JPEG", or None
+# GeoTIFF compression for local post-processing and size estimates:
+# "LZW", "DEFLATE", "JPEG", or None. Export tasks themselves are always
+# plain cloud-optimized GeoTIFFs — the EE client only accepts
+# cloudOptimized/noData/fileDimensions in GEO_TIFF formatOptions.
 GEOTIFF_COMPRESSION = "LZW"
 
 # Maximum pixels for export (GEE limit is 1e13)
@@ -133,13 +143,19 @@ S2_BANDS = {
 # =============================================================================
 
 # Core bands for soil analysis (best balance of resolution and information)
-SOIL_ANALYSIS_BANDS = ["B2", "B3", "B4", "B8", "B11", "B12"]
+# Tuples: immutable, shared across imports, safe to use as cache keys
+SOIL_ANALYSIS_BANDS = ("B2", "B3", "B4", "B8", "B11", "B12")
 
 # Full spectral export (all useful bands)
-FULL_SPECTRAL_BANDS = ["B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B11", "B12"]
+FULL_SPECTRAL_BANDS = ("B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B11", "B12")
 
 # High resolution only (10m bands)
-HIGH_RES_BANDS = ["B2", "B3", "B4", "B8"]
+HIGH_RES_BANDS = ("B2", "B3", "B4", "B8")
+
+# Frozenset views for O(1) membership tests in hot paths; the list
+# versions above keep the documented iteration/export order
+SOIL_INDICES_SET = frozenset(SOIL_INDICES)
+FULL_SPECTRAL_BANDS_SET = frozenset(FULL_SPECTRAL_BANDS)
 
 # Band descriptions for reference
 BAND_INFO = {
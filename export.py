@@ -4,12 +4,35 @@ Handles exporting processed images to Google Drive, Cloud Storage, or as GEE ass
 """
 
 import ee
-from typing import List, Optional, Dict
+import logging
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
 import time
 
 import config
 import compression_img
 
+logger = logging.getLogger("sentinelapi.export")
+
+
+def _geotiff_format_options() -> dict:
+    """
+    Build GeoTIFF formatOptions for export tasks.
+
+    Earth Engine does not expose compression selection on export: the
+    client whitelist in ee.batch._build_image_file_export_options
+    accepts only cloudOptimized, noData and fileDimensions for GEO_TIFF
+    and raises EEException on anything else, so keep this dict to the
+    supported keys. Compression has to happen in a post-download step
+    (see compression_img) if smaller files are wanted.
+
+    Returns:
+        dict: formatOptions for ee.batch.Export.image.* calls.
+    """
+    return {"cloudOptimized": True}
+
 
 def export_to_drive(
     image: ee.Image,
@@ -18,13 +41,13 @@ def export_to_drive(
     folder: str = None,
     file_prefix: str = None,
     scale: int = None,
-    bands: List[str] = None,
+    bands: Sequence[str] = None,
     crs: str = "EPSG:4326",
     start_task: bool = True
 ) -> ee.batch.Task:
     """
     Export image to Google Drive.
-    
+
     Args:
         image: Image to export.
         roi: Region of interest.
@@ -35,7 +58,7 @@ def export_to_drive(
         bands: Bands to export. If None, exports all.
         crs: Coordinate reference system.
         start_task: If True, starts the export task immediately.
-    
+
     Returns:
         ee.batch.Task: The export task object.
     """
@@ -61,18 +84,16 @@ def export_to_drive(
         crs=crs,
         maxPixels=config.MAX_PIXELS,
         fileFormat="GeoTIFF",
-        formatOptions={
-            "cloudOptimized": True
-        }
+        formatOptions=_geotiff_format_options()
     )
-    
+
     if start_task:
         task.start()
-        print(f"✓ Started export task: {filename}")
-        print(f"  Destination: Google Drive/{folder}")
-        print(f"  Scale: {scale}m, CRS: {crs}")
+        logger.info(f"✓ Started export task: {filename}")
+        logger.info(f"  Destination: Google Drive/{folder}")
+        logger.info(f"  Scale: {scale}m, CRS: {crs}")
     else:
-        print(f"✓ Created export task: {filename} (not started)")
+        logger.info(f"✓ Created export task: {filename} (not started)")
     
     return task
 
@@ -84,13 +105,13 @@ def export_to_cloud_storage(
     bucket: str,
     file_prefix: str = None,
     scale: int = None,
-    bands: List[str] = None,
+    bands: Sequence[str] = None,
     crs: str = "EPSG:4326",
     start_task: bool = True
 ) -> ee.batch.Task:
     """
     Export image to Google Cloud Storage.
-    
+
     Args:
         image: Image to export.
         roi: Region of interest.
@@ -101,7 +122,7 @@ def export_to_cloud_storage(
         bands: Bands to export.
         crs: Coordinate reference system.
         start_task: If True, starts the export task immediately.
-    
+
     Returns:
         ee.batch.Task: The export task object.
     """
@@ -120,15 +141,13 @@ def export_to_cloud_storage(
         crs=crs,
         maxPixels=config.MAX_PIXELS,
         fileFormat="GeoTIFF",
-        formatOptions={
-            "cloudOptimized": True
-        }
+        formatOptions=_geotiff_format_options()
     )
-    
+
     if start_task:
         task.start()
-        print(f"✓ Started export task: {description}")
-        print(f"  Destination: gs://{bucket}/{file_prefix or description}")
+        logger.info(f"✓ Started export task: {description}")
+        logger.info(f"  Destination: gs://{bucket}/{file_prefix or description}")
     
     return task
 
@@ -139,7 +158,7 @@ def export_as_asset(
     asset_id: str,
     description: str = None,
     scale: int = None,
-    bands: List[str] = None,
+    bands: Sequence[str] = None,
     start_task: bool = True
 ) -> ee.batch.Task:
     """
@@ -175,11 +194,65 @@ def export_as_asset(
     
     if start_task:
         task.start()
-        print(f"✓ Started asset export: {asset_id}")
+        logger.info(f"✓ Started asset export: {asset_id}")
     
     return task
 
 
+def export_to_local(
+    image: ee.Image,
+    roi: ee.Geometry,
+    description: str,
+    scale: int = None,
+    output_dir: str = ".",
+    max_direct_mb: float = 30
+) -> str:
+    """
+    Download an image directly instead of queueing a batch task.
+
+    Batch tasks add minutes of queue latency; for the point-plus-buffer
+    ROIs this codebase works with, the output fits well under the direct
+    download limit, and getDownloadURL returns in seconds. Images whose
+    estimated size exceeds max_direct_mb fall back to a Drive task.
+
+    Args:
+        image: Image to export.
+        roi: Region of interest.
+        description: Output name (becomes <description>.tif).
+        scale: Export scale in meters. Defaults to config.EXPORT_SCALE.
+        output_dir: Local directory for the file.
+        max_direct_mb: Size cutoff before falling back to Drive.
+
+    Returns:
+        str: Local file path, or the ee.batch.Task when falling back.
+    """
+    scale = scale or config.EXPORT_SCALE
+
+    estimate = compression_img.estimate_file_size(image, roi, scale=scale)
+    if estimate["estimated_mb"] > max_direct_mb:
+        logger.info(
+            f"  {description}: ~{estimate['estimated_mb']:.0f} MB exceeds "
+            f"direct-download limit, falling back to Drive task"
+        )
+        return export_to_drive(image, roi, description, scale=scale)
+
+    url = image.getDownloadURL({
+        "scale": scale,
+        "region": roi,
+        "format": "GEO_TIFF",
+        "filePerBand": False,
+    })
+
+    path = os.path.join(output_dir, f"{description}.tif")
+    response = requests.get(url, timeout=300)
+    response.raise_for_status()
+    with open(path, "wb") as f:
+        f.write(response.content)
+
+    logger.info(f"✓ Downloaded {description} to {path}")
+    return path
+
+
 def export_multiple_products(
     composite: ee.Image,
     roi: ee.Geometry,
@@ -206,28 +279,38 @@ def export_multiple_products(
                  "rgb", "agriculture", "soil_vis", "indices", "spectral"
     
     Returns:
-        dict: Dictionary of task name to task object.
+        dict: Dictionary of task name to task object (or local file
+             path when config.EXPORT_DESTINATION is "local").
     """
     prefix = prefix or config.FILE_PREFIX
     folder = folder or config.DRIVE_FOLDER
     scale = scale or config.EXPORT_SCALE
     products = products or ["rgb", "indices", "spectral"]
-    
-    tasks = {}
-    
+
+    # All output filenames in one place; keeps the branches template-free
+    # and gives a future multi-ROI exporter a single point to parameterize
+    names = {
+        "rgb": f"{prefix}_rgb",
+        "agriculture": f"{prefix}_agriculture",
+        "soil_vis": f"{prefix}_soil_swir",
+        "indices": f"{prefix}_soil_indices",
+        "spectral": f"{prefix}_spectral",
+    }
+
+    # Collect (name, image, description, extra kwargs) per product, then
+    # submit all export tasks concurrently: each task.start() is its own
+    # server round-trip, and the high-volume endpoint configured in
+    # auth.setup_gee handles the parallel submissions
+    jobs = []
+
     if "rgb" in products:
         # True color RGB
         rgb = compression_img.prepare_rgb_visualization(
-            composite, 
+            composite,
             config.VIS_BANDS_RGB
         )
-        tasks["rgb"] = export_to_drive(
-            rgb, roi, 
-            f"{prefix}_rgb",
-            folder=folder, 
-            scale=scale
-        )
-    
+        jobs.append(("rgb", rgb, names["rgb"], {}))
+
     if "agriculture" in products:
         # False color for agriculture
         agri = compression_img.prepare_rgb_visualization(
@@ -235,13 +318,8 @@ def export_multiple_products(
             config.VIS_BANDS_AGRICULTURE,
             max_val=5000
         )
-        tasks["agriculture"] = export_to_drive(
-            agri, roi,
-            f"{prefix}_agriculture",
-            folder=folder,
-            scale=scale
-        )
-    
+        jobs.append(("agriculture", agri, names["agriculture"], {}))
+
     if "soil_vis" in products:
         # SWIR composite for soil/geology
         soil_vis = compression_img.prepare_rgb_visualization(
@@ -249,44 +327,122 @@ def export_multiple_products(
             config.VIS_BANDS_SOIL,
             max_val=5000
         )
-        tasks["soil_vis"] = export_to_drive(
-            soil_vis, roi,
-            f"{prefix}_soil_swir",
-            folder=folder,
-            scale=scale
-        )
-    
-    if "indices" in products:
+        jobs.append(("soil_vis", soil_vis, names["soil_vis"], {}))
+
+    # Intersect the wanted bands with the composite's server-side, so no
+    # band-name payload crosses the wire; one small combined size fetch
+    # remains to gate the empty cases
+    if "indices" in products or "spectral" in products:
+        in_composite = ee.Filter.inList("item", composite.bandNames())
+        index_bands = ee.List(list(config.SOIL_INDICES)).filter(in_composite)
+        spectral_bands = ee.List(list(config.FULL_SPECTRAL_BANDS)).filter(in_composite)
+        sizes = ee.Dictionary({
+            "indices": index_bands.size(),
+            "spectral": spectral_bands.size(),
+        }).getInfo()
+
+        # One shared float cast: both float products select from the
+        # same converted image instead of each appending its own
+        # toFloat node over the full composite. The visualization
+        # products keep selecting from the original (smaller dtype).
+        composite_float = composite.toFloat()
+
+    if "indices" in products and sizes["indices"]:
         # Soil indices as float
-        index_bands = [b for b in config.SOIL_INDICES 
-                      if b in composite.bandNames().getInfo()]
-        if index_bands:
-            indices = composite.select(index_bands).toFloat()
-            tasks["indices"] = export_to_drive(
-                indices, roi,
-                f"{prefix}_soil_indices",
-                folder=folder,
-                scale=scale
-            )
-    
-    if "spectral" in products:
+        indices = composite_float.select(index_bands)
+        jobs.append(("indices", indices, names["indices"], {}))
+
+    if "spectral" in products and sizes["spectral"]:
         # All spectral bands
-        spectral_bands = ["B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B11", "B12"]
-        available_bands = [b for b in spectral_bands 
-                         if b in composite.bandNames().getInfo()]
-        if available_bands:
-            spectral = composite.select(available_bands).toFloat()
-            tasks["spectral"] = export_to_drive(
-                spectral, roi,
-                f"{prefix}_spectral",
-                folder=folder,
-                scale=scale
-            )
-    
-    print(f"\n✓ Started {len(tasks)} export tasks")
+        spectral = composite_float.select(spectral_bands)
+        jobs.append(("spectral", spectral, names["spectral"], {}))
+
+    tasks = {}
+    local = config.EXPORT_DESTINATION == "local"
+    if jobs:
+        # Threads, not processes: the submissions are I/O-bound and
+        # ee.batch.Task objects aren't picklable
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            if local:
+                # Small-ROI fast path: direct downloads return in
+                # seconds instead of sitting in the task queue
+                futures = {
+                    name: executor.submit(
+                        export_to_local, image, roi, description,
+                        scale=scale, **extra
+                    )
+                    for name, image, description, extra in jobs
+                }
+            else:
+                futures = {
+                    name: executor.submit(
+                        export_to_drive, image, roi, description,
+                        folder=folder, scale=scale, **extra
+                    )
+                    for name, image, description, extra in jobs
+                }
+            tasks = {name: future.result() for name, future in futures.items()}
+
+    if local:
+        logger.info(f"\n✓ Exported {len(tasks)} products locally")
+    else:
+        logger.info(f"\n✓ Started {len(tasks)} export tasks")
     return tasks
 
 
+def export_indices_table(
+    composite: ee.Image,
+    rois: ee.FeatureCollection,
+    description: str = None,
+    folder: str = None,
+    scale: int = None,
+    start_task: bool = True
+) -> ee.batch.Task:
+    """
+    Export per-ROI index statistics as one table task.
+
+    Scaling to many plantations with per-ROI raster exports burns one
+    task (and its queue wait) per region per product. For tabular
+    outputs — mean index values per plantation — a single reduceRegions
+    over a FeatureCollection collapses N ROIs into one CSV export task.
+
+    Args:
+        composite: Composite image with index bands.
+        rois: FeatureCollection of regions (one feature per plantation).
+        description: Task description. Defaults to
+                    "<config.FILE_PREFIX>_indices_table".
+        folder: Drive folder. Defaults to config.DRIVE_FOLDER.
+        scale: Reduction scale in meters. Defaults to config.EXPORT_SCALE.
+        start_task: If True, starts the export task immediately.
+
+    Returns:
+        ee.batch.Task: The table export task.
+    """
+    description = description or f"{config.FILE_PREFIX}_indices_table"
+    folder = folder or config.DRIVE_FOLDER
+    scale = scale or config.EXPORT_SCALE
+
+    stats = composite.reduceRegions(
+        collection=rois,
+        reducer=ee.Reducer.mean(),
+        scale=scale
+    )
+
+    task = ee.batch.Export.table.toDrive(
+        collection=stats,
+        description=description,
+        folder=folder,
+        fileFormat="CSV"
+    )
+
+    if start_task:
+        task.start()
+        logger.info(f"✓ Started table export: {description}")
+        logger.info(f"  Destination: Google Drive/{folder}")
+
+    return task
+
+
 def check_task_status(task: ee.batch.Task) -> dict:
     """
     Check status of an export task.
@@ -312,109 +468,135 @@ def check_task_status(task: ee.batch.Task) -> dict:
 def wait_for_task(
     task: ee.batch.Task,
     timeout_minutes: int = 30,
-    poll_interval: int = 30
+    poll_interval: int = 30,
+    description: str = None
 ) -> bool:
     """
     Wait for an export task to complete.
-    
+
     Args:
         task: Export task to wait for.
         timeout_minutes: Maximum wait time in minutes.
         poll_interval: Seconds between status checks.
-    
+        description: Optional label for log lines. Defaults to the
+                    description the task was built with.
+
     Returns:
         bool: True if completed successfully, False otherwise.
     """
-    print(f"Waiting for task: {task.status()['description']}")
+    # The description is already in the local task config; don't spend a
+    # status() round-trip just to print it
+    desc = description or (task.config or {}).get("description", task.id)
+    logger.info(f"Waiting for task: {desc}")
     
     start_time = time.time()
     timeout_seconds = timeout_minutes * 60
-    
+    last_state = None
+
     while True:
         status = task.status()
         state = status["state"]
-        
+
         if state == "COMPLETED":
             elapsed = (time.time() - start_time) / 60
-            print(f"✓ Task completed in {elapsed:.1f} minutes")
+            logger.info(f"✓ Task completed in {elapsed:.1f} minutes")
             return True
-        
+
         elif state == "FAILED":
-            print(f"✗ Task failed: {status.get('error_message', 'Unknown error')}")
+            logger.info(f"✗ Task failed: {status.get('error_message', 'Unknown error')}")
             return False
-        
+
         elif state == "CANCELLED":
-            print("✗ Task was cancelled")
+            logger.info("✗ Task was cancelled")
             return False
-        
+
         elapsed = time.time() - start_time
         if elapsed > timeout_seconds:
-            print(f"✗ Timeout after {timeout_minutes} minutes")
+            logger.info(f"✗ Timeout after {timeout_minutes} minutes")
             return False
-        
-        remaining = (timeout_seconds - elapsed) / 60
-        print(f"  Status: {state} (waiting... {remaining:.0f} min remaining)")
+
+        # Only log on state transitions; a line per poll makes long runs
+        # unreadable and adds a flush before every sleep
+        if state != last_state:
+            remaining = (timeout_seconds - elapsed) / 60
+            logger.info(f"  Status: {state} ({remaining:.0f} min remaining)")
+            last_state = state
+
         time.sleep(poll_interval)
 
 
 def wait_for_all_tasks(
     tasks: Dict[str, ee.batch.Task],
     timeout_minutes: int = 60,
-    poll_interval: int = 30
+    poll_interval: int = 15
 ) -> Dict[str, bool]:
     """
     Wait for multiple export tasks to complete.
-    
+
     Args:
         tasks: Dictionary of task name to task object.
         timeout_minutes: Maximum total wait time.
-        poll_interval: Seconds between status checks.
-    
+        poll_interval: Starting seconds between status checks; doubles
+                      each poll up to 120s, since tasks finish on
+                      minute timescales.
+
     Returns:
         dict: Task name to success status.
     """
-    print(f"\nMonitoring {len(tasks)} export tasks...")
-    
+    logger.info(f"\nMonitoring {len(tasks)} export tasks...")
+
     results = {}
     start_time = time.time()
     timeout_seconds = timeout_minutes * 60
-    
+
     pending = set(tasks.keys())
-    
+    task_ids = {name: tasks[name].id for name in pending}
+    interval = poll_interval
+    polls = 0
+
     while pending:
         elapsed = time.time() - start_time
         if elapsed > timeout_seconds:
-            print(f"\n✗ Timeout after {timeout_minutes} minutes")
+            logger.info(f"\n✗ Timeout after {timeout_minutes} minutes")
             for name in pending:
                 results[name] = False
             break
-        
-        for name in list(pending):
-            status = tasks[name].status()
+
+        # One batched status request per tick instead of one HTTP
+        # round-trip per task per tick
+        names = list(pending)
+        statuses = ee.data.getTaskStatus([task_ids[n] for n in names])
+
+        for name, status in zip(names, statuses):
             state = status["state"]
-            
+
             if state == "COMPLETED":
-                print(f"  ✓ {name}: completed")
+                logger.info(f"  ✓ {name}: completed")
                 results[name] = True
                 pending.remove(name)
-            
+
             elif state == "FAILED":
-                print(f"  ✗ {name}: failed - {status.get('error_message', 'Unknown')}")
+                logger.info(f"  ✗ {name}: failed - {status.get('error_message', 'Unknown')}")
                 results[name] = False
                 pending.remove(name)
-            
+
             elif state == "CANCELLED":
-                print(f"  ✗ {name}: cancelled")
+                logger.info(f"  ✗ {name}: cancelled")
                 results[name] = False
                 pending.remove(name)
-        
+
         if pending:
-            remaining = (timeout_seconds - elapsed) / 60
-            print(f"  {len(pending)} tasks pending... ({remaining:.0f} min remaining)")
-            time.sleep(poll_interval)
+            # Terminal transitions print above; keep the pending tick to
+            # an occasional summary so long runs stay scannable
+            polls += 1
+            if polls % 10 == 0:
+                remaining = (timeout_seconds - elapsed) / 60
+                logger.info(f"  {len(pending)} tasks pending... ({remaining:.0f} min remaining)")
+            time.sleep(interval)
+            interval = min(interval * 2, 120)
     
     completed = sum(1 for v in results.values() if v)
-    print(f"\n✓ Completed: {completed}/{len(tasks)} tasks")
+    logger.info(f"\n✓ Completed: {completed}/{len(tasks)} tasks")
     
     return results
 
@@ -422,32 +604,32 @@ def wait_for_all_tasks(
 def list_running_tasks() -> List[dict]:
     """
     List all currently running export tasks.
-    
+
     Returns:
         list: List of task status dictionaries.
     """
-    tasks = ee.batch.Task.list()
-    running = [t for t in tasks if t.status()["state"] in ["READY", "RUNNING"]]
-    
-    print(f"\nRunning tasks: {len(running)}")
-    for task in running:
-        status = task.status()
-        print(f"  - {status['description']}: {status['state']}")
-    
-    return [t.status() for t in running]
+    # One batched status fetch instead of Task.list() plus a status()
+    # round-trip per task
+    statuses = ee.data.getTaskList()
+    running = [s for s in statuses if s["state"] in ("READY", "RUNNING")]
+
+    logger.info(f"\nRunning tasks: {len(running)}")
+    for status in running:
+        logger.info(f"  - {status['description']}: {status['state']}")
+
+    return running
 
 
 def cancel_all_tasks():
     """
     Cancel all pending and running tasks.
     """
-    tasks = ee.batch.Task.list()
+    statuses = ee.data.getTaskList()
     cancelled = 0
-    
-    for task in tasks:
-        state = task.status()["state"]
-        if state in ["READY", "RUNNING"]:
-            task.cancel()
+
+    for status in statuses:
+        if status["state"] in ("READY", "RUNNING"):
+            ee.data.cancelTask(status["id"])
             cancelled += 1
-    
-    print(f"✓ Cancelled {cancelled} tasks")
\ No newline at end of file
+
+    logger.info(f"✓ Cancelled {cancelled} tasks")
\ No newline at end of file
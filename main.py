@@ -14,13 +14,16 @@ Location: Coastal Ecuador (Manabí Province)
 """
 
 import argparse
+import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 # Import all modules
 import config
 from auth import setup_gee
 from retrieval import (
     create_region_of_interest,
+    count_collection,
     get_sentinel2_collection,
     get_s2_cloudless_collection,
     get_sentinel1_collection,
@@ -42,6 +45,8 @@ from export import (
     list_running_tasks
 )
 from visualization import (
+    compute_stats_and_histograms,
+    compute_stats_and_histograms_tiled,
     get_all_indices_histograms,
     print_all_histograms,
     save_histogram_html,
@@ -69,12 +74,14 @@ def run_info_mode(roi):
     print("\n[INFO MODE] Checking available imagery...\n")
     
     # Get Sentinel-2 collection info
-    s2_collection, s2_count = get_sentinel2_collection(roi)
+    s2_collection = get_sentinel2_collection(roi)
     print_collection_info(s2_collection, "Sentinel-2")
-    
+    s2_count = count_collection(s2_collection)
+
     # Get Sentinel-1 collection info
-    s1_collection, s1_count = get_sentinel1_collection(roi)
+    s1_collection = get_sentinel1_collection(roi)
     print_collection_info(s1_collection, "Sentinel-1 SAR")
+    s1_count = count_collection(s1_collection)
     
     # Summary
     print("\n" + "=" * 40)
@@ -112,8 +119,9 @@ def run_pipeline(roi, calculate_stats=True, do_export=False, wait_for_export=Fal
     print("\n[1/5] Retrieving satellite imagery...")
     print("-" * 40)
     
-    s2_collection, s2_count = get_sentinel2_collection(roi)
-    
+    s2_collection = get_sentinel2_collection(roi)
+    s2_count = count_collection(s2_collection)
+
     if s2_count == 0:
         print("\n✗ No imagery found for specified parameters.")
         print("  Suggestions:")
@@ -159,7 +167,7 @@ def run_pipeline(roi, calculate_stats=True, do_export=False, wait_for_export=Fal
     results["composite_with_indices"] = composite_with_indices
     
     # Create bare soil mask
-    bare_soil_mask = create_bare_soil_mask(composite_with_indices)
+    bare_soil_mask = create_bare_soil_mask(composite_with_indices, has_indices=True)
     results["bare_soil_mask"] = bare_soil_mask
     
     # Step 5: Calculate statistics
@@ -179,26 +187,31 @@ def run_pipeline(roi, calculate_stats=True, do_export=False, wait_for_export=Fal
     
     # Generate histograms if requested
     if generate_histograms:
-        print("\n[HISTOGRAMS] Generating index histograms...")
+        print("\n[HISTOGRAMS+IMAGES] Generating histograms and thumbnails...")
         print("-" * 40)
-        
-        histograms = get_all_indices_histograms(
-            composite_with_indices,
-            roi,
-            indices=config.SOIL_INDICES
-        )
+
+        # Histogram reductions and thumbnail URLs are independent EE
+        # requests, so overlap them; each call fans its own requests out
+        # internally as well
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            hist_future = pool.submit(
+                get_all_indices_histograms,
+                composite_with_indices,
+                roi,
+                indices=config.SOIL_INDICES
+            )
+            urls_future = pool.submit(
+                get_all_visualization_urls, composite, roi, dimensions=600
+            )
+            histograms = hist_future.result()
+            image_urls = urls_future.result()
+
         results["histograms"] = histograms
-        
+        results["image_urls"] = image_urls
+
         # Print ASCII histograms to console
         print_all_histograms(histograms)
         
-        # Generate thumbnail images
-        print("\n[IMAGES] Generating visualization thumbnails...")
-        print("-" * 40)
-        
-        image_urls = get_all_visualization_urls(composite, roi, dimensions=600)
-        results["image_urls"] = image_urls
-        
         # Save as HTML with images, CSV, and JSON
         save_histogram_html(
             histograms, 
@@ -291,7 +304,10 @@ def main():
     )
     
     args = parser.parse_args()
-    
+
+    # Export diagnostics go through logging; mirror the plain print style
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Print header
     print_header()
     
@@ -4,11 +4,35 @@ Handles fetching Sentinel-2 and Sentinel-1 collections from GEE.
 """
 
 import ee
-from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import cached_property, lru_cache
+from typing import Dict, Tuple, Optional
 
 import config
 
 
+# Progress prints for the pipeline CLI; API callers issuing many
+# retrievals per request can silence them with retrieval.VERBOSE = False
+VERBOSE = True
+
+
+@lru_cache(maxsize=128)
+def _cached_point_roi(lat_q: float, lon_q: float, buffer_m: int) -> ee.Geometry:
+    return ee.Geometry.Point([lon_q, lat_q]).buffer(buffer_m)
+
+
+@lru_cache(maxsize=128)
+def _cached_bbox_roi(
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float
+) -> ee.Geometry:
+    return ee.Geometry.Rectangle([min_lon, min_lat, max_lon, max_lat])
+
+
 def create_region_of_interest(
     latitude: float = None,
     longitude: float = None,
@@ -16,23 +40,27 @@ def create_region_of_interest(
 ) -> ee.Geometry:
     """
     Create a circular region of interest around given coordinates.
-    
+
+    Memoized on (lat, lon, buffer) quantized to 6 decimals: repeated
+    calls return the same geometry object, so identical ROIs reuse one
+    graph node and EE's result cache can hit downstream.
+
     Args:
         latitude: Center latitude. Defaults to config.LATITUDE.
         longitude: Center longitude. Defaults to config.LONGITUDE.
         buffer_m: Buffer radius in meters. Defaults to config.BUFFER_RADIUS_M.
-    
+
     Returns:
         ee.Geometry: Circular geometry for the ROI.
     """
     lat = latitude or config.LATITUDE
     lon = longitude or config.LONGITUDE
     buffer = buffer_m or config.BUFFER_RADIUS_M
-    
-    point = ee.Geometry.Point([lon, lat])
-    roi = point.buffer(buffer)
-    
-    print(f"✓ Created ROI: center ({lat}, {lon}), radius {buffer}m")
+
+    roi = _cached_point_roi(round(lat, 6), round(lon, 6), int(buffer))
+
+    if VERBOSE:
+        print(f"✓ Created ROI: center ({lat}, {lon}), radius {buffer}m")
     return roi
 
 
@@ -44,18 +72,25 @@ def create_bbox_roi(
 ) -> ee.Geometry:
     """
     Create a rectangular region of interest from bounding box.
-    
+
+    Memoized like create_region_of_interest, with corners quantized
+    to 6 decimals.
+
     Args:
         min_lon: Western boundary longitude.
         min_lat: Southern boundary latitude.
         max_lon: Eastern boundary longitude.
         max_lat: Northern boundary latitude.
-    
+
     Returns:
         ee.Geometry: Rectangle geometry for the ROI.
     """
-    roi = ee.Geometry.Rectangle([min_lon, min_lat, max_lon, max_lat])
-    print(f"✓ Created bbox ROI: [{min_lon}, {min_lat}, {max_lon}, {max_lat}]")
+    roi = _cached_bbox_roi(
+        round(min_lon, 6), round(min_lat, 6),
+        round(max_lon, 6), round(max_lat, 6)
+    )
+    if VERBOSE:
+        print(f"✓ Created bbox ROI: [{min_lon}, {min_lat}, {max_lon}, {max_lat}]")
     return roi
 
 
@@ -64,40 +99,57 @@ def get_sentinel2_collection(
     start_date: str = None,
     end_date: str = None,
     max_cloud_percent: int = None
-) -> Tuple[ee.ImageCollection, int]:
+) -> ee.ImageCollection:
     """
     Retrieve Sentinel-2 Surface Reflectance collection.
-    
+
+    Returns the lazy filtered collection without forcing a count:
+    size() materializes the filtered collection server-side, so callers
+    that need the number of images should ask count_collection() once.
+
     Args:
         roi: Region of interest geometry.
         start_date: Start date (YYYY-MM-DD). Defaults to config.START_DATE.
         end_date: End date (YYYY-MM-DD). Defaults to config.END_DATE.
-        max_cloud_percent: Maximum cloud cover percentage. 
+        max_cloud_percent: Maximum cloud cover percentage.
                           Defaults to config.MAX_SCENE_CLOUD_PERCENT.
-    
+
     Returns:
-        Tuple of (ee.ImageCollection, image_count)
+        ee.ImageCollection: Filtered Sentinel-2 collection.
     """
     start = start_date or config.START_DATE
     end = end_date or config.END_DATE
     max_cloud = max_cloud_percent or config.MAX_SCENE_CLOUD_PERCENT
-    
+
     collection = (
         ee.ImageCollection(config.S2_COLLECTION)
         .filterBounds(roi)
         .filterDate(start, end)
         .filter(ee.Filter.lt("CLOUDY_PIXEL_PERCENTAGE", max_cloud))
     )
-    
-    # Get image count
-    count = collection.size().getInfo()
-    
-    print(f"✓ Retrieved Sentinel-2 collection")
-    print(f"  Date range: {start} to {end}")
-    print(f"  Max cloud cover: {max_cloud}%")
-    print(f"  Images found: {count}")
-    
-    return collection, count
+
+    if VERBOSE:
+        print(f"✓ Retrieved Sentinel-2 collection")
+        print(f"  Date range: {start} to {end}")
+        print(f"  Max cloud cover: {max_cloud}%")
+
+    return collection
+
+
+def count_collection(collection: ee.ImageCollection) -> int:
+    """
+    Force the image count of a collection.
+
+    The one place a size().getInfo() round-trip is paid deliberately;
+    the getters above stay lazy.
+
+    Args:
+        collection: An ee.ImageCollection.
+
+    Returns:
+        int: Number of images.
+    """
+    return collection.size().getInfo()
 
 
 def get_s2_cloudless_collection(
@@ -127,33 +179,127 @@ def get_s2_cloudless_collection(
         .filterBounds(roi)
         .filterDate(start, end)
     )
-    
-    count = collection.size().getInfo()
-    print(f"✓ Retrieved s2cloudless collection: {count} images")
-    
+
+    if VERBOSE:
+        print("✓ Retrieved s2cloudless collection")
+
     return collection
 
 
+@lru_cache(maxsize=128)
+def _cached_s2_collection(
+    lat_q: float,
+    lon_q: float,
+    buffer_m: int,
+    start_date: str,
+    end_date: str,
+    max_cloud_percent: int
+) -> Tuple[ee.ImageCollection, int]:
+    roi = ee.Geometry.Point([lon_q, lat_q]).buffer(buffer_m)
+    collection = get_sentinel2_collection(roi, start_date, end_date, max_cloud_percent)
+    # The API path needs the count for its empty-collection check, so
+    # this wrapper pays it once and memoizes it with the collection
+    return collection, count_collection(collection)
+
+
+@lru_cache(maxsize=128)
+def _cached_s2_cloudless_collection(
+    lat_q: float,
+    lon_q: float,
+    buffer_m: int,
+    start_date: str,
+    end_date: str
+) -> ee.ImageCollection:
+    roi = ee.Geometry.Point([lon_q, lat_q]).buffer(buffer_m)
+    return get_s2_cloudless_collection(roi, start_date, end_date)
+
+
+def get_sentinel2_collection_for_point(
+    latitude: float,
+    longitude: float,
+    buffer_m: int,
+    start_date: str = None,
+    end_date: str = None,
+    max_cloud_percent: int = None
+) -> Tuple[ee.ImageCollection, int]:
+    """
+    Memoized variant of get_sentinel2_collection keyed on point parameters.
+
+    Identical repeat queries (dashboard reloads, retries) reuse the cached
+    collection and image count instead of rebuilding the filtered
+    collection and re-issuing the size().getInfo() round-trip.
+
+    Args:
+        latitude: Center latitude (quantized to 6 decimals for the key).
+        longitude: Center longitude (quantized to 6 decimals for the key).
+        buffer_m: Buffer radius in meters.
+        start_date: Start date (YYYY-MM-DD). Defaults to config.START_DATE.
+        end_date: End date (YYYY-MM-DD). Defaults to config.END_DATE.
+        max_cloud_percent: Maximum cloud cover percentage.
+
+    Returns:
+        Tuple of (ee.ImageCollection, image_count)
+    """
+    return _cached_s2_collection(
+        round(latitude, 6),
+        round(longitude, 6),
+        int(buffer_m),
+        start_date,
+        end_date,
+        max_cloud_percent
+    )
+
+
+def get_s2_cloudless_collection_for_point(
+    latitude: float,
+    longitude: float,
+    buffer_m: int,
+    start_date: str = None,
+    end_date: str = None
+) -> ee.ImageCollection:
+    """
+    Memoized variant of get_s2_cloudless_collection keyed on point parameters.
+
+    Args:
+        latitude: Center latitude (quantized to 6 decimals for the key).
+        longitude: Center longitude (quantized to 6 decimals for the key).
+        buffer_m: Buffer radius in meters.
+        start_date: Start date (YYYY-MM-DD). Defaults to config.START_DATE.
+        end_date: End date (YYYY-MM-DD). Defaults to config.END_DATE.
+
+    Returns:
+        ee.ImageCollection: Cloud probability collection.
+    """
+    return _cached_s2_cloudless_collection(
+        round(latitude, 6),
+        round(longitude, 6),
+        int(buffer_m),
+        start_date,
+        end_date
+    )
+
+
 def get_sentinel1_collection(
     roi: ee.Geometry,
     start_date: str = None,
     end_date: str = None,
     orbit_pass: str = "DESCENDING"
-) -> Tuple[ee.ImageCollection, int]:
+) -> ee.ImageCollection:
     """
     Retrieve Sentinel-1 SAR GRD collection.
-    
+
     Sentinel-1 provides radar imagery that penetrates clouds,
     useful as a backup when optical imagery is unavailable.
-    
+    Lazy like the other getters; use count_collection() for the count.
+
     Args:
         roi: Region of interest geometry.
         start_date: Start date (YYYY-MM-DD). Defaults to config.START_DATE.
         end_date: End date (YYYY-MM-DD). Defaults to config.END_DATE.
         orbit_pass: "ASCENDING" or "DESCENDING". Affects viewing geometry.
-    
+
     Returns:
-        Tuple of (ee.ImageCollection, image_count)
+        ee.ImageCollection: Filtered Sentinel-1 collection.
     """
     start = start_date or config.START_DATE
     end = end_date or config.END_DATE
@@ -168,15 +314,13 @@ def get_sentinel1_collection(
         .filter(ee.Filter.eq("orbitProperties_pass", orbit_pass))
         .select(config.S1_POLARIZATION)
     )
-    
-    count = collection.size().getInfo()
-    
-    print(f"✓ Retrieved Sentinel-1 collection")
-    print(f"  Date range: {start} to {end}")
-    print(f"  Orbit: {orbit_pass}")
-    print(f"  Images found: {count}")
-    
-    return collection, count
+
+    if VERBOSE:
+        print(f"✓ Retrieved Sentinel-1 collection")
+        print(f"  Date range: {start} to {end}")
+        print(f"  Orbit: {orbit_pass}")
+
+    return collection
 
 
 def get_collection_dates(collection: ee.ImageCollection) -> list:
@@ -189,15 +333,20 @@ def get_collection_dates(collection: ee.ImageCollection) -> list:
     Returns:
         list: Sorted list of date strings.
     """
-    dates = (
+    # Bucket timestamps to whole days and dedupe server-side so only the
+    # distinct day numbers cross the wire (tiled S2 scenes share dates,
+    # so this is often 5-10x fewer elements than the raw timestamps);
+    # the string formatting stays client-side
+    days = (
         collection
         .aggregate_array("system:time_start")
-        .map(lambda d: ee.Date(d).format("YYYY-MM-dd"))
+        .map(lambda t: ee.Number(t).divide(86400000).floor())
         .distinct()
         .sort()
         .getInfo()
     )
-    return dates
+    epoch = date(1970, 1, 1)
+    return [(epoch + timedelta(days=int(d))).isoformat() for d in days]
 
 
 def get_collection_metadata(collection: ee.ImageCollection) -> dict:
@@ -210,23 +359,55 @@ def get_collection_metadata(collection: ee.ImageCollection) -> dict:
     Returns:
         dict: Metadata including count, date range, and cloud stats.
     """
-    count = collection.size().getInfo()
-    
+    # Bundle every aggregate into one deferred dictionary: one round-trip
+    # instead of five (count, dates, and the three cloud aggregates).
+    # The ee.Algorithms.If short-circuits server-side, so an empty
+    # collection answers with just the count and never runs the date and
+    # cloud aggregates
+    size = collection.size()
+    full = ee.Dictionary({
+        "count": size,
+        "times": collection.aggregate_array("system:time_start"),
+        "cloud_mean": collection.aggregate_mean("CLOUDY_PIXEL_PERCENTAGE"),
+        "cloud_min": collection.aggregate_min("CLOUDY_PIXEL_PERCENTAGE"),
+        "cloud_max": collection.aggregate_max("CLOUDY_PIXEL_PERCENTAGE"),
+    })
+
+    try:
+        meta = ee.Dictionary(
+            ee.Algorithms.If(size.gt(0), full, ee.Dictionary({"count": 0}))
+        ).getInfo()
+    except Exception:
+        # Collections without CLOUDY_PIXEL_PERCENTAGE (e.g. Sentinel-1)
+        # fail the fused fetch; retry without the cloud aggregates
+        no_cloud = ee.Dictionary({
+            "count": size,
+            "times": collection.aggregate_array("system:time_start"),
+        })
+        meta = ee.Dictionary(
+            ee.Algorithms.If(size.gt(0), no_cloud, ee.Dictionary({"count": 0}))
+        ).getInfo()
+
+    count = meta["count"]
     if count == 0:
         return {"count": 0, "dates": [], "cloud_stats": None}
-    
-    dates = get_collection_dates(collection)
-    
-    # Try to get cloud statistics (Sentinel-2 only)
-    try:
+
+    # Format the epoch-ms timestamps client-side; cheaper than mapping
+    # ee.Date.format over the collection server-side
+    dates = sorted({
+        datetime.fromtimestamp(t / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+        for t in meta["times"]
+    })
+
+    if "cloud_mean" in meta and meta["cloud_mean"] is not None:
         cloud_stats = {
-            "mean": collection.aggregate_mean("CLOUDY_PIXEL_PERCENTAGE").getInfo(),
-            "min": collection.aggregate_min("CLOUDY_PIXEL_PERCENTAGE").getInfo(),
-            "max": collection.aggregate_max("CLOUDY_PIXEL_PERCENTAGE").getInfo(),
+            "mean": meta["cloud_mean"],
+            "min": meta["cloud_min"],
+            "max": meta["cloud_max"],
         }
-    except:
+    else:
         cloud_stats = None
-    
+
     return {
         "count": count,
         "dates": dates,
@@ -235,6 +416,63 @@ def get_collection_metadata(collection: ee.ImageCollection) -> dict:
     }
 
 
+@dataclass
+class LazyCollection:
+    """
+    Collection wrapper that defers and caches metadata round-trips.
+
+    The get_*_collection functions already return lazy collections; this
+    wrapper adds memoized accessors on top, so consumers that read
+    .count or .dates twice pay the getInfo() once and consumers that
+    never read them pay nothing. The raw collection stays available as
+    .coll for piping into masking/compositing.
+    """
+    coll: ee.ImageCollection
+
+    @cached_property
+    def count(self) -> int:
+        return count_collection(self.coll)
+
+    @cached_property
+    def dates(self) -> list:
+        return get_collection_dates(self.coll)
+
+    @cached_property
+    def metadata(self) -> dict:
+        return get_collection_metadata(self.coll)
+
+    @property
+    def cloud_stats(self):
+        return self.metadata["cloud_stats"]
+
+
+def fetch_all_metadata(collections: Dict[str, ee.ImageCollection]) -> Dict[str, dict]:
+    """
+    Fetch metadata for several collections concurrently.
+
+    Each get_collection_metadata call is one network round-trip, so
+    independent collections (Sentinel-2, Sentinel-1, s2cloudless) can be
+    fetched in parallel threads instead of back to back; the GIL is
+    released while the sockets wait.
+
+    Args:
+        collections: Mapping of display name -> ee.ImageCollection.
+
+    Returns:
+        dict: Mapping of display name -> metadata dict
+              (same shape as get_collection_metadata).
+    """
+    if not collections:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(len(collections), 8)) as pool:
+        futures = {
+            name: pool.submit(get_collection_metadata, collection)
+            for name, collection in collections.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
 def print_collection_info(collection: ee.ImageCollection, name: str = "Collection"):
     """
     Print detailed information about a collection.
@@ -4,11 +4,83 @@ Implements various spectral indices for soil type and quality analysis.
 """
 
 import ee
+from functools import wraps
 from typing import List, Dict
 
 import config
 
 
+# Progress prints for the pipeline CLI. When indices are computed per
+# request or in a loop over many images the stdio cost adds up, so
+# callers can silence them with soil.VERBOSE = False
+VERBOSE = True
+
+
+# Per-image cache of computed index bands, keyed on the source ee.Image
+# object (not id(): ids get reused after collection, which would alias
+# unrelated images), so repeated calls on the same image return the same
+# expression subtree and Earth Engine's backend result cache can hit
+# instead of evaluating a duplicate graph node. Weak keys cannot work
+# here — every cached index holds a strong reference back to its source
+# image through the expression graph — so the dict is bounded with FIFO
+# eviction instead, like visualization._REDUCTION_CACHE.
+_INDEX_CACHE: Dict = {}
+_INDEX_CACHE_MAX = 128
+
+
+def _per_image_store(image: ee.Image):
+    """Fetch or create the bounded cache slot for an image, or None."""
+    try:
+        store = _INDEX_CACHE.get(image)
+    except TypeError:
+        # Unhashable input: caller just computes
+        return None
+    if store is None:
+        if len(_INDEX_CACHE) >= _INDEX_CACHE_MAX:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)))
+        store = _INDEX_CACHE[image] = {}
+    return store
+
+# The complete band set the index formulas read. Computing indices from
+# an image pre-selected to these lets the tile engine skip fetching the
+# unused bands when the index bands are materialized
+_SOIL_BANDS = tuple(
+    config.S2_BANDS[k]
+    for k in ("blue", "green", "red", "nir", "swir_1", "swir_2")
+)
+
+
+def _band(image: ee.Image, band_name: str) -> ee.Image:
+    """
+    Select a band, reusing one graph node per (image, band).
+
+    Several index formulas read the same bands (red, NIR, ...); caching
+    the select in the per-image store means calculate_all_indices builds
+    one node per band instead of one per formula that touches it.
+    """
+    per_image = _per_image_store(image)
+    if per_image is None:
+        return image.select(band_name)
+    key = "band:" + band_name
+    if key not in per_image:
+        per_image[key] = image.select(band_name)
+    return per_image[key]
+
+
+def _memoize_per_image(func):
+    """Cache a calculate_* result per source image object."""
+    @wraps(func)
+    def wrapper(image):
+        per_image = _per_image_store(image)
+        if per_image is None:
+            return func(image)
+        if func.__name__ not in per_image:
+            per_image[func.__name__] = func(image)
+        return per_image[func.__name__]
+    return wrapper
+
+
+@_memoize_per_image
 def calculate_ndsi(image: ee.Image) -> ee.Image:
     """
     Calculate Normalized Difference Soil Index.
@@ -32,6 +104,7 @@ def calculate_ndsi(image: ee.Image) -> ee.Image:
     return ndsi
 
 
+@_memoize_per_image
 def calculate_bare_soil_index(image: ee.Image) -> ee.Image:
     """
     Calculate Bare Soil Index (BI).
@@ -46,19 +119,25 @@ def calculate_bare_soil_index(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with BI values.
     """
-    swir1 = image.select(config.S2_BANDS["swir_1"])
-    red = image.select(config.S2_BANDS["red"])
-    nir = image.select(config.S2_BANDS["nir"])
-    blue = image.select(config.S2_BANDS["blue"])
-    
-    numerator = swir1.add(red).subtract(nir).subtract(blue)
-    denominator = swir1.add(red).add(nir).add(blue)
-    
+    swir1 = _band(image, config.S2_BANDS["swir_1"])
+    red = _band(image, config.S2_BANDS["red"])
+    nir = _band(image, config.S2_BANDS["nir"])
+    blue = _band(image, config.S2_BANDS["blue"])
+
+    # Shared subexpressions: (SWIR1 + Red) and (NIR + Blue) appear in
+    # both the numerator and the denominator
+    swir_red = swir1.add(red)
+    nir_blue = nir.add(blue)
+
+    numerator = swir_red.subtract(nir_blue)
+    denominator = swir_red.add(nir_blue)
+
     bi = numerator.divide(denominator).rename("BI")
-    
+
     return bi
 
 
+@_memoize_per_image
 def calculate_bsi(image: ee.Image) -> ee.Image:
     """
     Calculate Bare Soil Index (alternative formula - BSI).
@@ -73,19 +152,24 @@ def calculate_bsi(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with BSI values.
     """
-    swir2 = image.select(config.S2_BANDS["swir_2"])
-    red = image.select(config.S2_BANDS["red"])
-    nir = image.select(config.S2_BANDS["nir"])
-    blue = image.select(config.S2_BANDS["blue"])
-    
-    numerator = swir2.add(red).subtract(nir).subtract(blue)
-    denominator = swir2.add(red).add(nir).add(blue)
-    
+    swir2 = _band(image, config.S2_BANDS["swir_2"])
+    red = _band(image, config.S2_BANDS["red"])
+    nir = _band(image, config.S2_BANDS["nir"])
+    blue = _band(image, config.S2_BANDS["blue"])
+
+    # Same CSE as calculate_bare_soil_index, with SWIR2 in place of SWIR1
+    swir_red = swir2.add(red)
+    nir_blue = nir.add(blue)
+
+    numerator = swir_red.subtract(nir_blue)
+    denominator = swir_red.add(nir_blue)
+
     bsi = numerator.divide(denominator).multiply(100).add(100).rename("BSI")
-    
+
     return bsi
 
 
+@_memoize_per_image
 def calculate_color_index(image: ee.Image) -> ee.Image:
     """
     Calculate Soil Color Index (CI).
@@ -101,14 +185,15 @@ def calculate_color_index(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with CI values.
     """
-    red = image.select(config.S2_BANDS["red"])
-    green = image.select(config.S2_BANDS["green"])
+    red = _band(image, config.S2_BANDS["red"])
+    green = _band(image, config.S2_BANDS["green"])
     
     ci = red.subtract(green).divide(red.add(green)).rename("CI")
     
     return ci
 
 
+@_memoize_per_image
 def calculate_ndmi(image: ee.Image) -> ee.Image:
     """
     Calculate Normalized Difference Moisture Index.
@@ -132,6 +217,7 @@ def calculate_ndmi(image: ee.Image) -> ee.Image:
     return ndmi
 
 
+@_memoize_per_image
 def calculate_ndvi(image: ee.Image) -> ee.Image:
     """
     Calculate Normalized Difference Vegetation Index.
@@ -155,6 +241,7 @@ def calculate_ndvi(image: ee.Image) -> ee.Image:
     return ndvi
 
 
+@_memoize_per_image
 def calculate_saturation_index(image: ee.Image) -> ee.Image:
     """
     Calculate Soil Saturation Index (SSI).
@@ -169,15 +256,16 @@ def calculate_saturation_index(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with SSI values.
     """
-    red = image.select(config.S2_BANDS["red"])
-    green = image.select(config.S2_BANDS["green"])
-    blue = image.select(config.S2_BANDS["blue"])
+    red = _band(image, config.S2_BANDS["red"])
+    green = _band(image, config.S2_BANDS["green"])
+    blue = _band(image, config.S2_BANDS["blue"])
     
     ssi = red.subtract(green).divide(red.add(green).add(blue)).rename("SSI")
     
     return ssi
 
 
+@_memoize_per_image
 def calculate_brightness_index(image: ee.Image) -> ee.Image:
     """
     Calculate Soil Brightness Index.
@@ -193,14 +281,15 @@ def calculate_brightness_index(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with brightness values.
     """
-    red = image.select(config.S2_BANDS["red"])
-    nir = image.select(config.S2_BANDS["nir"])
+    red = _band(image, config.S2_BANDS["red"])
+    nir = _band(image, config.S2_BANDS["nir"])
     
     brightness = red.pow(2).add(nir.pow(2)).sqrt().rename("Brightness")
     
     return brightness
 
 
+@_memoize_per_image
 def calculate_clay_index(image: ee.Image) -> ee.Image:
     """
     Calculate Clay Minerals Index.
@@ -216,14 +305,15 @@ def calculate_clay_index(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with clay index values.
     """
-    swir1 = image.select(config.S2_BANDS["swir_1"])
-    swir2 = image.select(config.S2_BANDS["swir_2"])
+    swir1 = _band(image, config.S2_BANDS["swir_1"])
+    swir2 = _band(image, config.S2_BANDS["swir_2"])
     
     clay = swir1.divide(swir2).rename("ClayIndex")
     
     return clay
 
 
+@_memoize_per_image
 def calculate_organic_matter_index(image: ee.Image) -> ee.Image:
     """
     Calculate Soil Organic Matter Index (SOM proxy).
@@ -239,49 +329,63 @@ def calculate_organic_matter_index(image: ee.Image) -> ee.Image:
     Returns:
         ee.Image: Single band image with SOM index values.
     """
-    red = image.select(config.S2_BANDS["red"])
-    green = image.select(config.S2_BANDS["green"])
+    red = _band(image, config.S2_BANDS["red"])
+    green = _band(image, config.S2_BANDS["green"])
     
     # Normalize to 0-1 range (assuming 10000 scale factor)
     red_norm = red.divide(10000)
     green_norm = green.divide(10000)
     
-    som = ee.Image.constant(1).subtract(
+    # 1 - ratio written as ratio * -1 + 1: keeps the whole formula in
+    # per-band scalar ops instead of allocating an ee.Image.constant tile
+    ratio = (
         red_norm.multiply(2.5).subtract(green_norm)
         .divide(red_norm.add(green_norm))
-    ).rename("SOM_Index")
-    
+    )
+    som = ratio.multiply(-1).add(1).rename("SOM_Index")
+
     return som
 
 
+# Module-level dispatch: built once at import instead of per call.
+# Dict for name lookup in calculate_selected_indices, tuple of the same
+# functions (in insertion order) for the all-indices fast path
+_INDEX_FUNCTIONS = {
+    "NDSI": calculate_ndsi,
+    "BI": calculate_bare_soil_index,
+    "BSI": calculate_bsi,
+    "CI": calculate_color_index,
+    "NDMI": calculate_ndmi,
+    "NDVI": calculate_ndvi,
+    "SSI": calculate_saturation_index,
+    "Brightness": calculate_brightness_index,
+    "ClayIndex": calculate_clay_index,
+    "SOM_Index": calculate_organic_matter_index,
+}
+_ALL_INDEX_FNS = tuple(_INDEX_FUNCTIONS.values())
+
+
 def calculate_all_indices(image: ee.Image) -> ee.Image:
     """
     Calculate all soil indices and add as bands.
-    
+
     Args:
         image: Sentinel-2 image.
-    
+
     Returns:
         ee.Image: Image with all soil index bands added.
     """
-    indices = [
-        calculate_ndsi(image),
-        calculate_bare_soil_index(image),
-        calculate_bsi(image),
-        calculate_color_index(image),
-        calculate_ndmi(image),
-        calculate_ndvi(image),
-        calculate_saturation_index(image),
-        calculate_brightness_index(image),
-        calculate_clay_index(image),
-        calculate_organic_matter_index(image),
-    ]
-    
-    result = image
-    for index in indices:
-        result = result.addBands(index)
-    
-    print("✓ Calculated all soil indices")
+    # Root the index subtree at the six bands the formulas actually
+    # read; the returned image keeps the caller's full band set
+    selected = image.select(list(_SOIL_BANDS))
+
+    # All index bands share the same parsed source image node, so catting
+    # them and appending once keeps the graph a single pass instead of a
+    # chain of ten intermediate addBands images
+    result = image.addBands(ee.Image.cat([fn(selected) for fn in _ALL_INDEX_FNS]))
+
+    if VERBOSE:
+        print("✓ Calculated all soil indices")
     return result
 
 
@@ -301,65 +405,63 @@ def calculate_selected_indices(
         ee.Image: Image with selected soil index bands added.
     """
     indices_to_calc = indices or config.SOIL_INDICES
-    
-    index_functions = {
-        "NDSI": calculate_ndsi,
-        "BI": calculate_bare_soil_index,
-        "BSI": calculate_bsi,
-        "CI": calculate_color_index,
-        "NDMI": calculate_ndmi,
-        "NDVI": calculate_ndvi,
-        "SSI": calculate_saturation_index,
-        "Brightness": calculate_brightness_index,
-        "ClayIndex": calculate_clay_index,
-        "SOM_Index": calculate_organic_matter_index,
-    }
-    
-    result = image
+
     calculated = []
-    
     for index_name in indices_to_calc:
-        if index_name in index_functions:
-            index_image = index_functions[index_name](image)
-            result = result.addBands(index_image)
+        if index_name in _INDEX_FUNCTIONS:
             calculated.append(index_name)
         else:
             print(f"  Warning: Unknown index '{index_name}'")
-    
-    print(f"✓ Calculated indices: {', '.join(calculated)}")
+
+    result = image
+    if calculated:
+        selected = image.select(list(_SOIL_BANDS))
+        result = image.addBands(
+            ee.Image.cat([_INDEX_FUNCTIONS[name](selected) for name in calculated])
+        )
+
+    if VERBOSE:
+        print(f"✓ Calculated indices: {', '.join(calculated)}")
     return result
 
 
 def create_bare_soil_mask(
     image: ee.Image,
     ndvi_threshold: float = 0.3,
-    bsi_threshold: float = 100
+    bsi_threshold: float = 100,
+    has_indices: bool = None
 ) -> ee.Image:
     """
     Create a mask identifying bare soil pixels.
-    
+
     Combines NDVI (low vegetation) and BSI (high bare soil index)
     to identify pixels likely showing exposed soil.
-    
+
     Args:
         image: Image with NDVI and BSI bands (or original bands).
         ndvi_threshold: Maximum NDVI for bare soil (default 0.3).
         bsi_threshold: Minimum BSI for bare soil (default 100).
-    
+        has_indices: Whether NDVI/BSI bands are already present. Pass
+                    True after calculate_*_indices to reuse those bands
+                    without a round-trip; None checks bandNames() once.
+
     Returns:
         ee.Image: Binary mask (1 = bare soil, 0 = other).
     """
-    # Calculate indices if not present
-    try:
+    # select() is lazy, so a try/except around image.select("NDVI")
+    # never fires client-side; resolve band presence explicitly instead
+    if has_indices is None:
+        bands = set(image.bandNames().getInfo())
+        has_indices = "NDVI" in bands and "BSI" in bands
+
+    if has_indices:
         ndvi = image.select("NDVI")
-    except:
-        ndvi = calculate_ndvi(image)
-    
-    try:
         bsi = image.select("BSI")
-    except:
+    else:
+        ndvi = calculate_ndvi(image)
         bsi = calculate_bsi(image)
-    
+
+
     # Bare soil: low vegetation AND high bare soil index
     bare_soil_mask = ndvi.lt(ndvi_threshold).And(bsi.gt(bsi_threshold))
     
@@ -370,51 +472,146 @@ def get_soil_statistics(
     image: ee.Image,
     roi: ee.Geometry,
     indices: List[str] = None,
-    scale: int = 10
+    scale: int = 10,
+    sample_fraction: float = None
 ) -> Dict:
     """
     Calculate statistics for soil indices within region.
-    
+
     Args:
         image: Image with soil index bands.
         roi: Region of interest.
         indices: List of index band names to analyze.
         scale: Scale for reduction in meters.
-    
+        sample_fraction: If set (0-1), compute statistics from a random
+                        pixel sample of that fraction instead of a full
+                        scan; latency scales with the fraction.
+
     Returns:
         dict: Statistics (mean, min, max, std) for each index.
     """
     indices = indices or config.SOIL_INDICES
-    
+
     stats = {}
-    
-    for index_name in indices:
-        try:
-            index_band = image.select(index_name)
-            
-            reducers = ee.Reducer.mean() \
-                .combine(ee.Reducer.minMax(), sharedInputs=True) \
-                .combine(ee.Reducer.stdDev(), sharedInputs=True)
-            
-            result = index_band.reduceRegion(
-                reducer=reducers,
-                geometry=roi,
+
+    reducers = ee.Reducer.mean() \
+        .combine(ee.Reducer.minMax(), sharedInputs=True) \
+        .combine(ee.Reducer.stdDev(), sharedInputs=True)
+
+    try:
+        if sample_fraction:
+            samples = image.select(list(indices)).sample(
+                region=roi,
                 scale=scale,
-                maxPixels=1e9
+                factor=sample_fraction,
+                tileScale=4
+            )
+
+            # Repeat the combined reducer across all index columns so one
+            # round-trip returns {"mean": [...], "min": [...], ...} with
+            # each list aligned to the indices order
+            result = samples.reduceColumns(
+                reducers.repeat(len(indices)),
+                list(indices)
             ).getInfo()
-            
+
+            for pos, index_name in enumerate(indices):
+                stats[index_name] = {
+                    "mean": result.get("mean", [])[pos] if result.get("mean") else None,
+                    "min": result.get("min", [])[pos] if result.get("min") else None,
+                    "max": result.get("max", [])[pos] if result.get("max") else None,
+                    "stdDev": result.get("stdDev", [])[pos] if result.get("stdDev") else None,
+                }
+            return stats
+
+        # One reduceRegion over all index bands: the combined reducer
+        # names outputs "<band>_mean", "<band>_min", etc., so a single
+        # getInfo replaces the former per-index loop of round-trips
+        result = image.select(list(indices)).reduceRegion(
+            reducer=reducers,
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        ).getInfo()
+
+        # Build the flat result keys once per index rather than
+        # re-formatting four strings on every dict access
+        for index_name in indices:
+            prefix = index_name + "_"
             stats[index_name] = {
-                "mean": result.get(f"{index_name}_mean"),
-                "min": result.get(f"{index_name}_min"),
-                "max": result.get(f"{index_name}_max"),
-                "stdDev": result.get(f"{index_name}_stdDev"),
+                "mean": result.get(prefix + "mean"),
+                "min": result.get(prefix + "min"),
+                "max": result.get(prefix + "max"),
+                "stdDev": result.get(prefix + "stdDev"),
             }
-        except Exception as e:
-            print(f"  Warning: Could not calculate stats for {index_name}: {e}")
-    
+    except Exception as e:
+        print(f"  Warning: Could not calculate soil statistics: {e}")
+
     return stats
 
 
+def get_soil_statistics_bulk(
+    image: ee.Image,
+    rois: List[ee.Geometry],
+    indices: List[str] = None,
+    scale: int = 10
+) -> List[Dict]:
+    """
+    Calculate soil statistics for many regions in one backend job.
+
+    Looping get_soil_statistics over M sites costs M round-trips and M
+    separate tile schedules; reduceRegions over a FeatureCollection of
+    the sites runs them all server-side and returns everything in one
+    getInfo(). Results are parsed into the same per-index dict shape as
+    get_soil_statistics, one entry per ROI in input order.
+
+    Args:
+        image: Image with soil index bands.
+        rois: List of region geometries.
+        indices: List of index band names to analyze.
+        scale: Scale for reduction in meters.
+
+    Returns:
+        list: One statistics dict per ROI.
+    """
+    indices = indices or config.SOIL_INDICES
+
+    reducers = ee.Reducer.mean() \
+        .combine(ee.Reducer.minMax(), sharedInputs=True) \
+        .combine(ee.Reducer.stdDev(), sharedInputs=True)
+
+    fc = ee.FeatureCollection([ee.Feature(roi) for roi in rois])
+
+    results = image.select(list(indices)).reduceRegions(
+        collection=fc,
+        reducer=reducers,
+        scale=scale
+    ).getInfo()
+
+    # Precompute the property keys once; the per-feature loop below runs
+    # M times and would otherwise re-format four strings per index each
+    # iteration
+    keys = [
+        (name, name + "_mean", name + "_min", name + "_max", name + "_stdDev")
+        for name in indices
+    ]
+
+    stats_per_roi = []
+    for feature in results.get("features", []):
+        props = feature.get("properties", {})
+        stats_per_roi.append({
+            name: {
+                "mean": props.get(k_mean),
+                "min": props.get(k_min),
+                "max": props.get(k_max),
+                "stdDev": props.get(k_std),
+            }
+            for name, k_mean, k_min, k_max, k_std in keys
+        })
+
+    return stats_per_roi
+
+
 def interpret_soil_indices(stats: Dict) -> Dict:
     """
     Provide interpretation of soil index statistics.
@@ -480,6 +677,90 @@ def interpret_soil_indices(stats: Dict) -> Dict:
     return interpretations
 
 
+def get_soil_interpretation(
+    image: ee.Image,
+    roi: ee.Geometry,
+    indices: List[str] = None,
+    scale: int = 10
+) -> Dict:
+    """
+    Compute soil interpretations in a single round-trip.
+
+    For callers that only want the interpretation strings (dashboards),
+    this evaluates the means and the threshold ladders server-side with
+    ee.Algorithms.If, so one getInfo() returns the finished dict — no
+    numeric statistics ever cross the wire. If you also need the
+    statistics themselves, use get_soil_statistics and feed its result
+    to interpret_soil_indices instead.
+
+    Thresholds mirror interpret_soil_indices; keep the two in sync.
+
+    Args:
+        image: Image with soil index bands.
+        roi: Region of interest.
+        indices: List of index band names to analyze.
+        scale: Scale for reduction in meters.
+
+    Returns:
+        dict: Interpretations keyed by aspect (vegetation, moisture, ...).
+    """
+    indices = indices or config.SOIL_INDICES
+
+    means = image.select(list(indices)).reduceRegion(
+        reducer=ee.Reducer.mean(),
+        geometry=roi,
+        scale=scale,
+        maxPixels=1e9
+    )
+
+    interp = {}
+
+    if "NDVI" in indices:
+        ndvi = ee.Number(means.get("NDVI"))
+        interp["vegetation"] = ee.Algorithms.If(
+            ndvi.lt(0.2), "Sparse/bare - good for soil analysis",
+            ee.Algorithms.If(
+                ndvi.lt(0.4), "Moderate vegetation cover",
+                "Dense vegetation - soil may be obscured"))
+
+    if "NDMI" in indices:
+        ndmi = ee.Number(means.get("NDMI"))
+        interp["moisture"] = ee.Algorithms.If(
+            ndmi.lt(0), "Dry conditions",
+            ee.Algorithms.If(
+                ndmi.lt(0.2), "Moderate moisture",
+                "High moisture content"))
+
+    if "CI" in indices:
+        ci = ee.Number(means.get("CI"))
+        interp["soil_color"] = ee.Algorithms.If(
+            ci.gt(0.1), "Reddish soil - possible iron oxidation",
+            ee.Algorithms.If(
+                ci.lt(-0.1), "Greenish/dark soil",
+                "Neutral soil color"))
+
+    if "BSI" in indices:
+        bsi = ee.Number(means.get("BSI"))
+        interp["bare_soil"] = ee.Algorithms.If(
+            bsi.gt(120), "High bare soil exposure",
+            ee.Algorithms.If(
+                bsi.gt(100), "Moderate bare soil",
+                "Low bare soil index"))
+
+    if "ClayIndex" in indices:
+        clay = ee.Number(means.get("ClayIndex"))
+        interp["clay_content"] = ee.Algorithms.If(
+            clay.gt(1.5), "Potentially high clay content",
+            ee.Algorithms.If(
+                clay.gt(1.2), "Moderate clay indicators",
+                "Lower clay indicators"))
+
+    if not interp:
+        return {}
+
+    return ee.Dictionary(interp).getInfo()
+
+
 def print_soil_analysis(stats: Dict, roi_name: str = "ROI"):
     """
     Print formatted soil analysis report.
@@ -3,13 +3,150 @@ Visualization module.
 Generates histograms, charts, and visual analysis of soil indices.
 """
 
+import csv
 import ee
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
+import io
+import itertools
 import json
+import math
+import os
+import string
+
+# Optional: vectorized histogram rendering. Listed in requirements.txt
+# under local visualization extras; everything degrades to pure Python
+# when it is absent.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: C-accelerated JSON for the chart data arrays, mirroring the
+# orjson fallback in app.py.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: JIT-compiled histogram binning for batch dashboards that
+# bin many local rasters; everything falls back to np.bincount or pure
+# Python when Numba is absent.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Optional: client-side thumbnail colorization. Pillow ships with the
+# matplotlib extra in requirements.txt; both degrade to server-rendered
+# thumbnails when absent.
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+try:
+    from matplotlib.colors import LinearSegmentedColormap
+except ImportError:
+    LinearSegmentedColormap = None
+
+import base64
+import requests
+from functools import lru_cache
 
 import config
 
 
+def _json_dumps(obj) -> str:
+    """Serialize with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _hist_summary(buckets: List[float], counts: List[float]) -> Tuple[float, float]:
+    """Total pixel count and weighted mean of histogram rows."""
+    if np is not None and counts:
+        counts_arr = np.asarray(counts, dtype=np.float64)
+        total = float(counts_arr.sum())
+        weighted = float(np.dot(np.asarray(buckets, dtype=np.float64), counts_arr))
+    else:
+        total = sum(counts)
+        weighted = sum(b * c for b, c in zip(buckets, counts))
+    mean = weighted / total if total > 0 else 0
+    return total, mean
+
+
+def _hist_stats(hist_data: Dict) -> Tuple[float, float]:
+    """
+    Return (total_pixels, mean) for a histogram dict.
+
+    The producers cache these under _total_pixels/_mean at ingestion so
+    the HTML, JSON and ASCII consumers don't each re-sum the buckets;
+    histograms built elsewhere fall back to computing them here.
+    """
+    total = hist_data.get("_total_pixels")
+    mean = hist_data.get("_mean")
+    if total is None or mean is None:
+        total, mean = _hist_summary(
+            hist_data.get("buckets", []), hist_data.get("counts", [])
+        )
+    return total, mean
+
+
+# Value ranges used for histogram reductions on each index
+INDEX_RANGES = {
+    "NDVI": (-1, 1),
+    "NDSI": (-1, 1),
+    "NDMI": (-1, 1),
+    "BI": (-1, 1),
+    "CI": (-1, 1),
+    "SSI": (-1, 1),
+    "BSI": (0, 200),
+    "Brightness": (0, 15000),
+    "ClayIndex": (0, 3),
+    "SOM_Index": (-2, 2),
+}
+
+
+# Client-side memo for reduceRegion round-trips: interactive re-renders
+# and overlapping report paths often request the same reduction for the
+# same (image, roi, parameters). ee objects are not hashable, so
+# functools.lru_cache cannot key on them directly; the serialized graph
+# strings give a stable content key instead, with FIFO eviction standing
+# in for LRU on the bounded dict.
+_REDUCTION_CACHE: Dict[tuple, Dict] = {}
+_REDUCTION_CACHE_MAX = 256
+
+
+def _cached_reduction(image: ee.Image, roi: ee.Geometry, extra: tuple, compute):
+    """
+    Memoize an EE reduction result by (image graph, roi graph, params).
+
+    Args:
+        image: Image the reduction runs over.
+        roi: Region of interest.
+        extra: Hashable tuple of the remaining call parameters.
+        compute: Zero-argument callable performing the actual round-trip.
+
+    Returns:
+        The computed (or cached) result of compute().
+    """
+    try:
+        key = (image.serialize(), roi.serialize(), extra)
+    except Exception:
+        return compute()
+
+    if key in _REDUCTION_CACHE:
+        return _REDUCTION_CACHE[key]
+
+    result = compute()
+    if len(_REDUCTION_CACHE) >= _REDUCTION_CACHE_MAX:
+        _REDUCTION_CACHE.pop(next(iter(_REDUCTION_CACHE)))
+    _REDUCTION_CACHE[key] = result
+    return result
+
+
 def get_thumbnail_url(
     image: ee.Image,
     roi: ee.Geometry,
@@ -49,115 +186,268 @@ def get_thumbnail_url(
 def get_all_visualization_urls(
     composite: ee.Image,
     roi: ee.Geometry,
-    dimensions: int = 512
+    dimensions: int = 512,
+    format: str = "thumbnail"
 ) -> Dict[str, str]:
     """
     Get thumbnail URLs for all standard visualizations.
-    
+
     Args:
         composite: Composite image with all bands.
         roi: Region of interest.
-        dimensions: Maximum dimension in pixels.
-    
+        dimensions: Maximum dimension in pixels (thumbnail format only).
+        format: "thumbnail" renders fixed-size thumbnails server-side;
+                "cog" returns one GeoTIFF download URL instead, letting a
+                COG-aware client fetch only the tiles it displays via
+                HTTP range reads rather than having EE rasterize every
+                visualization per request.
+
     Returns:
         dict: Visualization name to URL mapping.
     """
-    visualizations = {}
-    
-    # True Color RGB
-    try:
-        visualizations["True Color (RGB)"] = get_thumbnail_url(
+    if format == "cog":
+        try:
+            url = composite.getDownloadURL({
+                'scale': 10,
+                'region': roi,
+                'format': 'GEO_TIFF',
+                'filePerBand': False
+            })
+            print("  ✓ Generated GeoTIFF download URL")
+            return {"GeoTIFF (COG)": url}
+        except Exception as e:
+            print(f"  ✗ Failed to generate GeoTIFF URL, falling back to thumbnails: {e}")
+
+    # Shared subexpressions hoisted out of the closures: the index
+    # thumbnails then reference the same graph nodes, so the server can
+    # deduplicate tile reads and computation across requests
+    ndvi = composite.normalizedDifference(["B8", "B4"]).rename("NDVI")
+    ndmi = composite.normalizedDifference(["B8", "B11"]).rename("NDMI")
+
+    swir2 = composite.select("B12")
+    red = composite.select("B4")
+    nir = composite.select("B8")
+    blue = composite.select("B2")
+    swir_red = swir2.add(red)
+    nir_blue = nir.add(blue)
+    bsi = swir_red.subtract(nir_blue) \
+        .divide(swir_red.add(nir_blue)) \
+        .multiply(100).add(100).rename("BSI")
+
+    # Each getThumbURL is an independent blocking HTTPS round-trip, so
+    # build one closure per visualization and dispatch them all at once:
+    # total latency is roughly the slowest request instead of the sum of
+    # six
+
+    def true_color():
+        return get_thumbnail_url(
             composite, roi,
             bands=["B4", "B3", "B2"],
             min_val=7000, max_val=12000,
             dimensions=dimensions
         )
-        print("  ✓ Generated True Color thumbnail")
-    except Exception as e:
-        print(f"  ✗ Failed to generate True Color: {e}")
-    
-    # False Color Agriculture
-    try:
-        visualizations["False Color (Agriculture)"] = get_thumbnail_url(
+
+    def false_color():
+        return get_thumbnail_url(
             composite, roi,
             bands=["B8", "B4", "B3"],
             min_val=7000, max_val=15000,
             dimensions=dimensions
         )
-        print("  ✓ Generated False Color thumbnail")
-    except Exception as e:
-        print(f"  ✗ Failed to generate False Color: {e}")
-    
-    # SWIR Soil Composite
-    try:
-        visualizations["SWIR (Soil/Geology)"] = get_thumbnail_url(
+
+    def swir_soil():
+        return get_thumbnail_url(
             composite, roi,
             bands=["B11", "B8", "B4"],
             min_val=7000, max_val=15000,
             dimensions=dimensions
         )
-        print("  ✓ Generated SWIR Soil thumbnail")
-    except Exception as e:
-        print(f"  ✗ Failed to generate SWIR: {e}")
-    
-    # NDVI visualization (if available)
-    try:
-        # Create NDVI image with color palette
-        ndvi = composite.normalizedDifference(["B8", "B4"]).rename("NDVI")
+
+    def ndvi_thumb():
         ndvi_vis = ndvi.visualize(
             min=-0.2, max=0.8,
             palette=['red', 'yellow', 'green', 'darkgreen']
         )
-        visualizations["NDVI (Vegetation Health)"] = ndvi_vis.getThumbURL({
+        return ndvi_vis.getThumbURL({
             'dimensions': dimensions,
             'region': roi,
             'format': 'jpg'
         })
-        print("  ✓ Generated NDVI thumbnail")
-    except Exception as e:
-        print(f"  ✗ Failed to generate NDVI: {e}")
-    
-    # Moisture visualization
-    try:
-        ndmi = composite.normalizedDifference(["B8", "B11"]).rename("NDMI")
+
+    def ndmi_thumb():
         ndmi_vis = ndmi.visualize(
             min=-0.3, max=0.5,
             palette=['brown', 'yellow', 'cyan', 'blue']
         )
-        visualizations["NDMI (Moisture)"] = ndmi_vis.getThumbURL({
+        return ndmi_vis.getThumbURL({
             'dimensions': dimensions,
             'region': roi,
             'format': 'jpg'
         })
-        print("  ✓ Generated NDMI thumbnail")
-    except Exception as e:
-        print(f"  ✗ Failed to generate NDMI: {e}")
-    
-    # Bare Soil visualization
-    try:
-        # BSI visualization
-        swir2 = composite.select("B12")
-        red = composite.select("B4")
-        nir = composite.select("B8")
-        blue = composite.select("B2")
-        
-        bsi = swir2.add(red).subtract(nir).subtract(blue) \
-            .divide(swir2.add(red).add(nir).add(blue)) \
-            .multiply(100).add(100).rename("BSI")
-        
+
+    def bsi_thumb():
         bsi_vis = bsi.visualize(
             min=50, max=150,
             palette=['darkgreen', 'green', 'yellow', 'orange', 'red']
         )
-        visualizations["BSI (Bare Soil Index)"] = bsi_vis.getThumbURL({
+        return bsi_vis.getThumbURL({
             'dimensions': dimensions,
             'region': roi,
             'format': 'jpg'
         })
-        print("  ✓ Generated BSI thumbnail")
-    except Exception as e:
-        print(f"  ✗ Failed to generate BSI: {e}")
-    
+
+    jobs = [
+        ("True Color (RGB)", true_color),
+        ("False Color (Agriculture)", false_color),
+        ("SWIR (Soil/Geology)", swir_soil),
+        ("NDVI (Vegetation Health)", ndvi_thumb),
+        ("NDMI (Moisture)", ndmi_thumb),
+        ("BSI (Bare Soil Index)", bsi_thumb),
+    ]
+
+    visualizations = {}
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [(name, executor.submit(fn)) for name, fn in jobs]
+        # Collect in definition order so one failure doesn't drop or
+        # reorder the other visualizations
+        for name, future in futures:
+            try:
+                visualizations[name] = future.result()
+                print(f"  ✓ Generated {name} thumbnail")
+            except Exception as e:
+                print(f"  ✗ Failed to generate {name}: {e}")
+
+    return visualizations
+
+
+@lru_cache(maxsize=32)
+def _palette_lut(palette: tuple):
+    """256-entry uint8 RGB lookup table for a palette of color names."""
+    cmap = LinearSegmentedColormap.from_list("palette", list(palette), N=256)
+    return (cmap(np.arange(256))[:, :3] * 255).astype(np.uint8)
+
+
+def fetch_raw_thumbnail(
+    image: ee.Image,
+    band_name: str,
+    roi: ee.Geometry,
+    min_val: float,
+    max_val: float,
+    dimensions: int = 512
+):
+    """
+    Fetch a single-band thumbnail as a uint8 grayscale array.
+
+    Requesting one grayscale channel instead of a server-side
+    .visualize() PNG skips the per-tile palette lookup on EE's side and
+    moves a third of the bytes; the returned array can be recolored
+    client-side any number of times without another request.
+
+    Args:
+        image: Image containing the band.
+        band_name: Band to render.
+        roi: Region of interest.
+        min_val: Value mapped to black.
+        max_val: Value mapped to white.
+        dimensions: Maximum dimension in pixels.
+
+    Returns:
+        np.ndarray: 2-D uint8 array of the stretched band.
+    """
+    url = image.select(band_name).getThumbURL({
+        'bands': [band_name],
+        'min': min_val,
+        'max': max_val,
+        'dimensions': dimensions,
+        'region': roi,
+        'format': 'png'
+    })
+    response = requests.get(url, timeout=120)
+    response.raise_for_status()
+    return np.asarray(PILImage.open(io.BytesIO(response.content)).convert("L"))
+
+
+def colorize_thumbnail(gray, palette) -> str:
+    """
+    Apply a palette to a grayscale array and return a PNG data URL.
+
+    Args:
+        gray: 2-D uint8 array from fetch_raw_thumbnail().
+        palette: Sequence of color names, low to high.
+
+    Returns:
+        str: data:image/png;base64 URL ready for an <img> tag.
+    """
+    rgb = _palette_lut(tuple(palette))[gray]
+    buf = io.BytesIO()
+    PILImage.fromarray(rgb).save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def get_colorized_index_thumbnails(
+    composite: ee.Image,
+    roi: ee.Geometry,
+    dimensions: int = 512
+) -> Dict[str, str]:
+    """
+    Build the NDVI/NDMI/BSI thumbnails via client-side colorization.
+
+    Each index is fetched once as a raw grayscale PNG and colorized
+    locally with the same palettes get_all_visualization_urls asks the
+    server to bake in, so palette variants or re-renders reuse the
+    cached pixels instead of issuing new EE requests. Requires the
+    numpy/Pillow/matplotlib visualization extras; returns an empty dict
+    (so callers fall back to server-rendered thumbnails) when they are
+    not installed.
+
+    Args:
+        composite: Composite image with all bands.
+        roi: Region of interest.
+        dimensions: Maximum dimension in pixels.
+
+    Returns:
+        dict: Visualization name to PNG data URL mapping.
+    """
+    if np is None or PILImage is None or LinearSegmentedColormap is None:
+        print("  ✗ Client-side colorization needs the numpy/Pillow/matplotlib "
+              "extras; use get_all_visualization_urls instead")
+        return {}
+
+    ndvi = composite.normalizedDifference(["B8", "B4"]).rename("NDVI")
+    ndmi = composite.normalizedDifference(["B8", "B11"]).rename("NDMI")
+
+    swir_red = composite.select("B12").add(composite.select("B4"))
+    nir_blue = composite.select("B8").add(composite.select("B2"))
+    bsi = swir_red.subtract(nir_blue) \
+        .divide(swir_red.add(nir_blue)) \
+        .multiply(100).add(100).rename("BSI")
+
+    # Same ranges and palettes as the server-side .visualize() path
+    jobs = [
+        ("NDVI (Vegetation Health)", ndvi, "NDVI", -0.2, 0.8,
+         ('red', 'yellow', 'green', 'darkgreen')),
+        ("NDMI (Moisture)", ndmi, "NDMI", -0.3, 0.5,
+         ('brown', 'yellow', 'cyan', 'blue')),
+        ("BSI (Bare Soil Index)", bsi, "BSI", 50, 150,
+         ('darkgreen', 'green', 'yellow', 'orange', 'red')),
+    ]
+
+    visualizations = {}
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [
+            (name, palette, executor.submit(
+                fetch_raw_thumbnail, img, band, roi, lo, hi, dimensions))
+            for name, img, band, lo, hi, palette in jobs
+        ]
+        for name, palette, future in futures:
+            try:
+                visualizations[name] = colorize_thumbnail(future.result(), palette)
+                print(f"  ✓ Generated {name} thumbnail (client-side palette)")
+            except Exception as e:
+                print(f"  ✗ Failed to generate {name}: {e}")
+
     return visualizations
 
 
@@ -185,26 +475,134 @@ def get_histogram_data(
     Returns:
         dict: Histogram data with buckets and counts.
     """
-    band = image.select(band_name)
-    
-    histogram = band.reduceRegion(
-        reducer=ee.Reducer.histogram(
-            maxBuckets=num_buckets,
-            minBucketWidth=(max_val - min_val) / num_buckets
-        ),
-        geometry=roi,
-        scale=scale,
-        maxPixels=1e9
-    ).getInfo()
-    
-    hist_data = histogram.get(band_name, {})
-    
+    def _compute():
+        band = image.select(band_name)
+
+        # fixedHistogram keeps the bucket count bounded even for
+        # degenerate value ranges, unlike the auto-sizing histogram
+        # reducer.
+        histogram = band.reduceRegion(
+            reducer=ee.Reducer.fixedHistogram(min_val, max_val, num_buckets),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        ).getInfo()
+
+        # fixedHistogram rows are [bucketStart, count]
+        hist_rows = histogram.get(band_name) or []
+        bucket_width = (max_val - min_val) / num_buckets
+
+        if np is not None and hist_rows:
+            # Split the rows into columns in one vectorized pass
+            rows_np = np.asarray(hist_rows, dtype=np.float64)
+            buckets = (rows_np[:, 0] + bucket_width / 2).tolist()
+            counts = rows_np[:, 1].tolist()
+        else:
+            buckets = [row[0] + bucket_width / 2 for row in hist_rows]
+            counts = [row[1] for row in hist_rows]
+
+        total_pixels, mean_val = _hist_summary(buckets, counts)
+
+        return {
+            "band": band_name,
+            "buckets": buckets,
+            "counts": counts,
+            "min": min_val,
+            "max": max_val,
+            "_total_pixels": total_pixels,
+            "_mean": mean_val
+        }
+
+    extra = ("hist", band_name, scale, min_val, max_val, num_buckets)
+    return _cached_reduction(image, roi, extra, _compute)
+
+
+if numba is not None and np is not None:
+    @numba.njit(cache=True)
+    def _uniform_bincount(values, min_val, bucket_width, num_buckets):
+        """Single-pass fused quantize-and-count over a value array."""
+        counts = np.zeros(num_buckets, dtype=np.int64)
+        top = num_buckets - 1
+        for v in values:
+            i = int((v - min_val) / bucket_width)
+            if i < 0:
+                i = 0
+            elif i > top:
+                i = top
+            counts[i] += 1
+        return counts
+else:
+    _uniform_bincount = None
+
+
+def local_histogram(
+    arr,
+    min_val: float,
+    max_val: float,
+    num_buckets: int = 50,
+    band_name: str = "local"
+) -> Dict:
+    """
+    Build a histogram from an already-downloaded raster array.
+
+    For pixels that are in memory (e.g. a grayscale thumbnail from
+    fetch_raw_thumbnail), binning locally avoids an EE round-trip
+    entirely. With uniform buckets the bin index is a single division,
+    so np.bincount does the whole reduction in C.
+
+    Args:
+        arr: Array (or nested sequence) of pixel values.
+        min_val: Minimum value of the histogram range.
+        max_val: Maximum value of the histogram range.
+        num_buckets: Number of histogram buckets.
+        band_name: Label for the "band" key of the result.
+
+    Returns:
+        dict: Same shape as get_histogram_data(), so the ASCII, HTML,
+              CSV and JSON writers consume it unchanged.
+    """
+    bucket_width = (max_val - min_val) / num_buckets
+
+    if np is not None:
+        values = np.asarray(arr, dtype=np.float32).ravel()
+        if _uniform_bincount is not None:
+            # The JIT kernel fuses quantize, clip and count into one
+            # native pass with no temporary index arrays
+            counts = _uniform_bincount(
+                values, min_val, bucket_width, num_buckets
+            ).tolist()
+        else:
+            idx = np.clip(
+                ((values - min_val) / bucket_width).astype(np.int32),
+                0, num_buckets - 1
+            )
+            counts = np.bincount(idx, minlength=num_buckets).tolist()
+        buckets = (
+            np.arange(num_buckets, dtype=np.float64) * bucket_width
+            + (min_val + bucket_width / 2)
+        ).tolist()
+    else:
+        counts = [0] * num_buckets
+        top = num_buckets - 1
+        for row in arr:
+            for value in (row if isinstance(row, (list, tuple)) else (row,)):
+                i = int((value - min_val) / bucket_width)
+                counts[min(max(i, 0), top)] += 1
+        buckets = [
+            min_val + bucket_width / 2 + i * bucket_width
+            for i in range(num_buckets)
+        ]
+
+    total_pixels, mean_val = _hist_summary(buckets, counts)
+
     return {
         "band": band_name,
-        "buckets": hist_data.get("bucketMeans", []),
-        "counts": hist_data.get("histogram", []),
+        "buckets": buckets,
+        "counts": counts,
         "min": min_val,
-        "max": max_val
+        "max": max_val,
+        "_total_pixels": total_pixels,
+        "_mean": mean_val
     }
 
 
@@ -229,37 +627,384 @@ def get_all_indices_histograms(
         dict: Dictionary of index name to histogram data.
     """
     indices = indices or config.SOIL_INDICES
-    
-    # Define appropriate ranges for each index
-    index_ranges = {
-        "NDVI": (-1, 1),
-        "NDSI": (-1, 1),
-        "NDMI": (-1, 1),
-        "BI": (-1, 1),
-        "CI": (-1, 1),
-        "SSI": (-1, 1),
-        "BSI": (0, 200),
-        "Brightness": (0, 15000),
-        "ClayIndex": (0, 3),
-        "SOM_Index": (-2, 2),
-    }
-    
+
+    # Resolve every index range upfront, then group indices sharing a
+    # value range: fixedHistogram takes one (min, max) per reducer, so
+    # one deferred reduceRegion per group resolves in a single getInfo
+    # round-trip instead of one call per index
+    work = [(name, INDEX_RANGES.get(name, (-1, 1))) for name in indices]
+
+    range_groups = {}
+    for index_name, value_range in work:
+        range_groups.setdefault(value_range, []).append(index_name)
+
+    deferred = {}
+    for (min_val, max_val), group in range_groups.items():
+        deferred[f"{min_val}_{max_val}"] = image.select(group).reduceRegion(
+            reducer=ee.Reducer.fixedHistogram(min_val, max_val, num_buckets),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        )
+
     histograms = {}
-    
-    for index_name in indices:
-        try:
-            min_val, max_val = index_ranges.get(index_name, (-1, 1))
-            hist = get_histogram_data(
-                image, index_name, roi, scale, min_val, max_val, num_buckets
-            )
-            histograms[index_name] = hist
+
+    try:
+        resolved = ee.Dictionary(deferred).getInfo()
+    except Exception as e:
+        print(f"  ✗ Failed to generate histograms: {e}")
+        return histograms
+
+    for (min_val, max_val), group in range_groups.items():
+        result = resolved.get(f"{min_val}_{max_val}") or {}
+        bucket_width = (max_val - min_val) / num_buckets
+
+        for index_name in group:
+            # fixedHistogram rows are [bucketStart, count]
+            hist_rows = result.get(index_name) or []
+            buckets = [row[0] + bucket_width / 2 for row in hist_rows]
+            counts = [row[1] for row in hist_rows]
+            total_pixels, mean_val = _hist_summary(buckets, counts)
+            histograms[index_name] = {
+                "band": index_name,
+                "buckets": buckets,
+                "counts": counts,
+                "min": min_val,
+                "max": max_val,
+                "_total_pixels": total_pixels,
+                "_mean": mean_val
+            }
             print(f"  ✓ Generated histogram for {index_name}")
-        except Exception as e:
-            print(f"  ✗ Failed to generate histogram for {index_name}: {e}")
-    
+
     return histograms
 
 
+def compute_stats_and_histograms(
+    image: ee.Image,
+    roi: ee.Geometry,
+    indices: List[str] = None,
+    scale: int = 10,
+    num_buckets: int = 100,
+    sample_fraction: float = None
+) -> Tuple[Dict, Dict]:
+    """
+    Compute statistics and histograms for all indices in one pass.
+
+    Fuses the mean/stdDev/minMax and fixedHistogram reducers into a single
+    combined reducer per value range, so the server traverses the image
+    pyramid once and one getInfo round-trip replaces two calls per index.
+
+    Args:
+        image: Image with soil index bands.
+        roi: Region of interest.
+        indices: List of index names. Defaults to config.SOIL_INDICES.
+        scale: Scale in meters for reduction.
+        num_buckets: Number of fixed histogram buckets per index.
+        sample_fraction: If set (0-1), reduce a random pixel sample of
+                        that fraction instead of every pixel; statistics
+                        latency scales roughly with the fraction while
+                        histogram shape stays accurate for summaries.
+
+    Returns:
+        Tuple of (stats, histograms) dicts keyed by index name, in the
+        same shapes as get_soil_statistics / get_all_indices_histograms.
+    """
+    indices = indices or config.SOIL_INDICES
+
+    # fixedHistogram needs one (min, max) per reducer, so group indices
+    # that share a value range into a single reduceRegion call.
+    range_groups = {}
+    for index_name in indices:
+        value_range = INDEX_RANGES.get(index_name, (-1, 1))
+        range_groups.setdefault(value_range, []).append(index_name)
+
+    stats = {}
+    histograms = {}
+
+    if sample_fraction:
+        # Sampled path: reduce a random subset of pixels. One sample
+        # FeatureCollection feeds all indices and a single getInfo
+        # resolves every deferred reduceColumns at once.
+        samples = image.select(list(indices)).sample(
+            region=roi,
+            scale=scale,
+            factor=sample_fraction,
+            tileScale=4
+        )
+
+        deferred = {}
+        for (min_val, max_val), group in range_groups.items():
+            reducer = (
+                ee.Reducer.mean()
+                .combine(ee.Reducer.stdDev(), sharedInputs=True)
+                .combine(ee.Reducer.minMax(), sharedInputs=True)
+                .combine(
+                    ee.Reducer.fixedHistogram(min_val, max_val, num_buckets),
+                    sharedInputs=True
+                )
+            )
+            for index_name in group:
+                deferred[index_name] = samples.reduceColumns(
+                    reducer, [index_name]
+                )
+
+        resolved = ee.Dictionary(deferred).getInfo()
+
+        for (min_val, max_val), group in range_groups.items():
+            bucket_width = (max_val - min_val) / num_buckets
+            for index_name in group:
+                result = resolved.get(index_name) or {}
+                stats[index_name] = {
+                    "mean": result.get("mean"),
+                    "min": result.get("min"),
+                    "max": result.get("max"),
+                    "stdDev": result.get("stdDev"),
+                }
+                hist_rows = result.get("histogram") or []
+                buckets = [row[0] + bucket_width / 2 for row in hist_rows]
+                counts = [row[1] for row in hist_rows]
+                total_pixels, mean_val = _hist_summary(buckets, counts)
+                histograms[index_name] = {
+                    "band": index_name,
+                    "buckets": buckets,
+                    "counts": counts,
+                    "min": min_val,
+                    "max": max_val,
+                    "_total_pixels": total_pixels,
+                    "_mean": mean_val,
+                }
+
+        return stats, histograms
+
+    for (min_val, max_val), group in range_groups.items():
+        reducer = (
+            ee.Reducer.mean()
+            .combine(ee.Reducer.stdDev(), sharedInputs=True)
+            .combine(ee.Reducer.minMax(), sharedInputs=True)
+            .combine(
+                ee.Reducer.fixedHistogram(min_val, max_val, num_buckets),
+                sharedInputs=True
+            )
+        )
+
+        result = image.select(group).reduceRegion(
+            reducer=reducer,
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e10,
+            bestEffort=True
+        ).getInfo()
+
+        bucket_width = (max_val - min_val) / num_buckets
+
+        for index_name in group:
+            stats[index_name] = {
+                "mean": result.get(f"{index_name}_mean"),
+                "min": result.get(f"{index_name}_min"),
+                "max": result.get(f"{index_name}_max"),
+                "stdDev": result.get(f"{index_name}_stdDev"),
+            }
+
+            # fixedHistogram rows are [bucketStart, count]
+            hist_rows = result.get(f"{index_name}_histogram") or []
+            buckets = [row[0] + bucket_width / 2 for row in hist_rows]
+            counts = [row[1] for row in hist_rows]
+            total_pixels, mean_val = _hist_summary(buckets, counts)
+            histograms[index_name] = {
+                "band": index_name,
+                "buckets": buckets,
+                "counts": counts,
+                "min": min_val,
+                "max": max_val,
+                "_total_pixels": total_pixels,
+                "_mean": mean_val,
+            }
+
+    return stats, histograms
+
+
+def tile_roi(
+    roi: ee.Geometry,
+    tile_m: float = 2000
+) -> List[ee.Geometry]:
+    """
+    Split a region's bounding box into a grid of rectangular tiles.
+
+    Large regions reduced in one reduceRegion call block on a single
+    compute worker; tiling lets the caller fan reductions out in parallel.
+
+    Args:
+        roi: Region of interest.
+        tile_m: Approximate tile edge length in meters.
+
+    Returns:
+        list: ee.Geometry.Rectangle tiles covering the roi bounds.
+    """
+    coords = roi.bounds().coordinates().get(0).getInfo()
+
+    lons = [c[0] for c in coords]
+    lats = [c[1] for c in coords]
+    min_lon, max_lon = min(lons), max(lons)
+    min_lat, max_lat = min(lats), max(lats)
+
+    # Convert meters to degrees (approximate, fine for tiling purposes)
+    mid_lat = (min_lat + max_lat) / 2
+    deg_lat = tile_m / 111320.0
+    deg_lon = tile_m / (111320.0 * max(math.cos(math.radians(mid_lat)), 0.01))
+
+    tiles = []
+    lat = min_lat
+    while lat < max_lat:
+        lon = min_lon
+        while lon < max_lon:
+            tiles.append(ee.Geometry.Rectangle([
+                lon, lat,
+                min(lon + deg_lon, max_lon),
+                min(lat + deg_lat, max_lat)
+            ]))
+            lon += deg_lon
+        lat += deg_lat
+
+    return tiles
+
+
+def compute_stats_and_histograms_tiled(
+    image: ee.Image,
+    roi: ee.Geometry,
+    indices: List[str] = None,
+    scale: int = 10,
+    num_buckets: int = 100,
+    tile_m: float = 2000,
+    max_workers: int = 8
+) -> Tuple[Dict, Dict]:
+    """
+    Tiled variant of compute_stats_and_histograms for large regions.
+
+    Splits the roi into a grid, runs the fused reduction per tile on a
+    thread pool, and merges the partial results client-side: histograms
+    by element-wise bucket addition, min/max directly, and mean/stdDev
+    via pooled moments weighted by per-tile pixel counts. Latency scales
+    with the slowest tile instead of the total area.
+
+    Args:
+        image: Image with soil index bands.
+        roi: Region of interest.
+        indices: List of index names. Defaults to config.SOIL_INDICES.
+        scale: Scale in meters for reduction.
+        num_buckets: Number of fixed histogram buckets per index.
+        tile_m: Approximate tile edge length in meters.
+        max_workers: Thread pool size for per-tile reductions.
+
+    Returns:
+        Tuple of (stats, histograms) in the same shapes as
+        compute_stats_and_histograms.
+    """
+    indices = indices or config.SOIL_INDICES
+
+    tiles = tile_roi(roi, tile_m)
+    if len(tiles) <= 1:
+        return compute_stats_and_histograms(image, roi, indices, scale, num_buckets)
+
+    range_groups = {}
+    for index_name in indices:
+        value_range = INDEX_RANGES.get(index_name, (-1, 1))
+        range_groups.setdefault(value_range, []).append(index_name)
+
+    def reduce_tile(tile):
+        tile_result = {}
+        for (min_val, max_val), group in range_groups.items():
+            reducer = (
+                ee.Reducer.mean()
+                .combine(ee.Reducer.stdDev(), sharedInputs=True)
+                .combine(ee.Reducer.minMax(), sharedInputs=True)
+                .combine(ee.Reducer.count(), sharedInputs=True)
+                .combine(
+                    ee.Reducer.fixedHistogram(min_val, max_val, num_buckets),
+                    sharedInputs=True
+                )
+            )
+            tile_result.update(
+                image.select(group).reduceRegion(
+                    reducer=reducer,
+                    geometry=tile,
+                    scale=scale,
+                    maxPixels=1e10,
+                    bestEffort=True
+                ).getInfo()
+            )
+        return tile_result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tile_results = list(executor.map(reduce_tile, tiles))
+
+    stats = {}
+    histograms = {}
+
+    for (min_val, max_val), group in range_groups.items():
+        bucket_width = (max_val - min_val) / num_buckets
+
+        for index_name in group:
+            total_count = 0
+            weighted_mean = 0.0
+            weighted_moment2 = 0.0
+            mins = []
+            maxs = []
+            counts = [0.0] * num_buckets
+
+            for tile_result in tile_results:
+                n = tile_result.get(f"{index_name}_count") or 0
+                if not n:
+                    continue
+
+                mean = tile_result.get(f"{index_name}_mean") or 0.0
+                std_dev = tile_result.get(f"{index_name}_stdDev") or 0.0
+
+                total_count += n
+                weighted_mean += n * mean
+                weighted_moment2 += n * (std_dev * std_dev + mean * mean)
+
+                tile_min = tile_result.get(f"{index_name}_min")
+                tile_max = tile_result.get(f"{index_name}_max")
+                if tile_min is not None:
+                    mins.append(tile_min)
+                if tile_max is not None:
+                    maxs.append(tile_max)
+
+                hist_rows = tile_result.get(f"{index_name}_histogram") or []
+                for i, row in enumerate(hist_rows[:num_buckets]):
+                    counts[i] += row[1]
+
+            if total_count > 0:
+                pooled_mean = weighted_mean / total_count
+                pooled_var = max(weighted_moment2 / total_count - pooled_mean ** 2, 0.0)
+                stats[index_name] = {
+                    "mean": pooled_mean,
+                    "min": min(mins) if mins else None,
+                    "max": max(maxs) if maxs else None,
+                    "stdDev": math.sqrt(pooled_var),
+                }
+            else:
+                stats[index_name] = {
+                    "mean": None, "min": None, "max": None, "stdDev": None
+                }
+
+            merged_buckets = [
+                min_val + (i + 0.5) * bucket_width for i in range(num_buckets)
+            ]
+            total_pixels, mean_val = _hist_summary(merged_buckets, counts)
+            histograms[index_name] = {
+                "band": index_name,
+                "buckets": merged_buckets,
+                "counts": counts,
+                "min": min_val,
+                "max": max_val,
+                "_total_pixels": total_pixels,
+                "_mean": mean_val,
+            }
+
+    return stats, histograms
+
+
 def print_ascii_histogram(
     hist_data: Dict,
     width: int = 50,
@@ -287,31 +1032,39 @@ def print_ascii_histogram(
     print(f"  HISTOGRAM: {band}")
     print(f"{'='*60}")
     
-    # Normalize counts to fit height
-    normalized = [int((c / max_count) * height) for c in counts]
-    
-    # Print histogram rows (top to bottom)
-    for row in range(height, 0, -1):
-        line = "  │"
-        for val in normalized:
-            if val >= row:
-                line += "█"
-            else:
-                line += " "
-        print(line)
-    
+    if np is not None:
+        # Vectorized render: a broadcast comparison builds the whole
+        # height x buckets character grid in C instead of a nested
+        # Python loop of per-character string appends
+        counts_np = np.asarray(counts, dtype=np.float64)
+        normalized = (counts_np / max_count * height).astype(np.int32)
+        rows = np.arange(height, 0, -1)[:, None]
+        grid = np.where(normalized[None, :] >= rows, "█", " ")
+        for row_chars in grid:
+            print("  │" + "".join(row_chars))
+        n_cols = len(counts)
+    else:
+        # Normalize counts to fit height
+        normalized = [int((c / max_count) * height) for c in counts]
+
+        # Print histogram rows (top to bottom); building each row as a
+        # list and joining once avoids the quadratic cost of repeated
+        # string concatenation
+        for row in range(height, 0, -1):
+            cells = ["█" if val >= row else " " for val in normalized]
+            print("  │" + "".join(cells))
+        n_cols = len(normalized)
+
     # Print x-axis
-    print("  └" + "─" * len(normalized))
-    
+    print("  └" + "─" * n_cols)
+
     # Print range
     min_val = min(buckets) if buckets else 0
     max_val = max(buckets) if buckets else 1
-    print(f"   {min_val:.2f}" + " " * (len(normalized) - 10) + f"{max_val:.2f}")
-    
-    # Print statistics
-    total_pixels = sum(counts)
-    weighted_sum = sum(b * c for b, c in zip(buckets, counts))
-    mean_val = weighted_sum / total_pixels if total_pixels > 0 else 0
+    print(f"   {min_val:.2f}" + " " * (n_cols - 10) + f"{max_val:.2f}")
+
+    # Print statistics (cached by the producer where possible)
+    total_pixels, mean_val = _hist_stats(hist_data)
     
     print(f"\n  Total pixels: {total_pixels:,}")
     print(f"  Mean value: {mean_val:.4f}")
@@ -329,197 +1082,77 @@ def print_all_histograms(histograms: Dict[str, Dict]) -> None:
         print_ascii_histogram(hist_data)
 
 
-def generate_histogram_html(
-    histograms: Dict[str, Dict],
-    title: str = "Soil Index Histograms",
-    images: Dict[str, str] = None
-) -> str:
-    """
-    Generate an HTML page with interactive histograms using Chart.js.
-    
-    Args:
-        histograms: Dictionary of histogram data.
-        title: Page title.
-        images: Dictionary of image name to base64 data URL or file path.
-    
-    Returns:
-        str: HTML content.
-    """
-    charts_html = ""
-    chart_scripts = ""
-    images_html = ""
-    
-    colors = [
-        'rgba(75, 192, 192, 0.7)',
-        'rgba(255, 99, 132, 0.7)',
-        'rgba(54, 162, 235, 0.7)',
-        'rgba(255, 206, 86, 0.7)',
-        'rgba(153, 102, 255, 0.7)',
-        'rgba(255, 159, 64, 0.7)',
-        'rgba(199, 199, 199, 0.7)',
-        'rgba(83, 102, 255, 0.7)',
-        'rgba(255, 99, 255, 0.7)',
-        'rgba(99, 255, 132, 0.7)',
-    ]
-    
-    # Generate images section if provided
-    if images:
-        images_html = """
-        <h2 class="section-title">🛰️ Satellite Imagery</h2>
-        <div class="images-grid">
-        """
-        for img_name, img_data in images.items():
-            images_html += f"""
-            <div class="image-container">
-                <h3>{img_name}</h3>
-                <img src="{img_data}" alt="{img_name}" />
-            </div>
-            """
-        images_html += "</div>"
-    
-    for i, (index_name, hist_data) in enumerate(histograms.items()):
-        buckets = hist_data.get("buckets", [])
-        counts = hist_data.get("counts", [])
-        
-        if not buckets or not counts:
-            continue
-        
-        # Calculate statistics
-        total_pixels = sum(counts)
-        weighted_sum = sum(b * c for b, c in zip(buckets, counts))
-        mean_val = weighted_sum / total_pixels if total_pixels > 0 else 0
-        
-        canvas_id = f"chart_{index_name}"
-        color = colors[i % len(colors)]
-        
-        charts_html += f"""
-        <div class="chart-container">
-            <canvas id="{canvas_id}"></canvas>
-            <div class="stats">
-                <span>Pixels: {total_pixels:,}</span>
-                <span>Mean: {mean_val:.4f}</span>
-            </div>
-        </div>
-        """
-        
-        # Format data for JavaScript
-        labels = [f"{b:.3f}" for b in buckets]
-        
-        chart_scripts += f"""
-        new Chart(document.getElementById('{canvas_id}'), {{
-            type: 'bar',
-            data: {{
-                labels: {json.dumps(labels)},
-                datasets: [{{
-                    label: '{index_name}',
-                    data: {json.dumps(counts)},
-                    backgroundColor: '{color}',
-                    borderColor: '{color.replace("0.7", "1")}',
-                    borderWidth: 1
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: '{index_name} Distribution',
-                        font: {{ size: 16 }}
-                    }},
-                    legend: {{ display: false }}
-                }},
-                scales: {{
-                    x: {{
-                        title: {{ display: true, text: 'Value' }},
-                        ticks: {{ maxTicksLimit: 10 }}
-                    }},
-                    y: {{
-                        title: {{ display: true, text: 'Pixel Count' }},
-                        beginAtZero: true
-                    }}
-                }}
-            }}
-        }});
-        """
-    
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        * {{
+_HTML_STYLE = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
-        body {{
+        }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: #1a1a2e;
             color: #eee;
             padding: 20px;
-        }}
-        h1 {{
+        }
+        h1 {
             text-align: center;
             margin-bottom: 10px;
             color: #00d4ff;
-        }}
-        .subtitle {{
+        }
+        .subtitle {
             text-align: center;
             color: #888;
             margin-bottom: 30px;
-        }}
-        .section-title {{
+        }
+        .section-title {
             color: #00d4ff;
             margin: 40px 0 20px 0;
             padding-bottom: 10px;
             border-bottom: 2px solid #0f3460;
-        }}
-        .images-grid {{
+        }
+        .images-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
             gap: 20px;
             max-width: 1800px;
             margin: 0 auto 40px auto;
-        }}
-        .image-container {{
+        }
+        .image-container {
             background: #16213e;
             border-radius: 10px;
             padding: 15px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-        }}
-        .image-container h3 {{
+        }
+        .image-container h3 {
             color: #00d4ff;
             margin-bottom: 10px;
             font-size: 14px;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
-        .image-container img {{
+        }
+        .image-container img {
             width: 100%;
             height: auto;
             border-radius: 5px;
             border: 1px solid #333;
-        }}
-        .charts-grid {{
+        }
+        .charts-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(450px, 1fr));
             gap: 20px;
             max-width: 1800px;
             margin: 0 auto;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background: #16213e;
             border-radius: 10px;
             padding: 20px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-        }}
-        .chart-container canvas {{
+        }
+        .chart-container canvas {
             max-height: 300px;
-        }}
-        .stats {{
+        }
+        .stats {
             display: flex;
             justify-content: space-around;
             margin-top: 15px;
@@ -527,54 +1160,45 @@ def generate_histogram_html(
             border-top: 1px solid #333;
             color: #aaa;
             font-size: 14px;
-        }}
-        .stats span {{
+        }
+        .stats span {
             background: #0f3460;
             padding: 5px 15px;
             border-radius: 5px;
-        }}
-        .legend {{
+        }
+        .legend {
             max-width: 1800px;
             margin: 40px auto;
             background: #16213e;
             border-radius: 10px;
             padding: 20px;
-        }}
-        .legend h3 {{
+        }
+        .legend h3 {
             color: #00d4ff;
             margin-bottom: 15px;
-        }}
-        .legend-grid {{
+        }
+        .legend-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 15px;
-        }}
-        .legend-item {{
+        }
+        .legend-item {
             background: #0f3460;
             padding: 10px 15px;
             border-radius: 5px;
-        }}
-        .legend-item strong {{
+        }
+        .legend-item strong {
             color: #00d4ff;
-        }}
-        .legend-item p {{
+        }
+        .legend-item p {
             font-size: 13px;
             color: #aaa;
             margin-top: 5px;
-        }}
-    </style>
-</head>
-<body>
-    <h1>📊 {title}</h1>
-    <p class="subtitle">Satellite imagery and soil quality index analysis</p>
-    
-    {images_html}
-    
-    <h2 class="section-title">📈 Index Histograms</h2>
-    <div class="charts-grid">
-        {charts_html}
-    </div>
-    
+        }
+"""
+
+
+_HTML_LEGEND = """
     <div class="legend">
         <h3>📖 Index Interpretation Guide</h3>
         <div class="legend-grid">
@@ -604,15 +1228,207 @@ def generate_histogram_html(
             </div>
         </div>
     </div>
-    
+"""
+
+
+# Per-chart and script fragments prepared once at import; substitute()
+# is a single C-level pass per chart instead of re-parsing an f-string
+# template body on every loop iteration
+_CHART_CONTAINER_TEMPLATE = string.Template("""
+        <div class="chart-container">
+            <canvas id="$canvas"></canvas>
+            <div class="stats">
+                <span>Pixels: $pixels</span>
+                <span>Mean: $mean</span>
+            </div>
+        </div>
+        """)
+
+_CHARTS_SCRIPT_TEMPLATE = string.Template("""
     <script>
-        {chart_scripts}
+        const CHARTS = $charts;
+        CHARTS.forEach(c => new Chart(document.getElementById(c.id), {
+            type: 'bar',
+            data: {
+                labels: c.labels,
+                datasets: [{
+                    label: c.label,
+                    data: c.data,
+                    backgroundColor: c.color,
+                    borderColor: c.borderColor,
+                    borderWidth: 1
+                }]
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    title: {
+                        display: true,
+                        text: c.label + ' Distribution',
+                        font: { size: 16 }
+                    },
+                    legend: { display: false }
+                },
+                scales: {
+                    x: {
+                        title: { display: true, text: 'Value' },
+                        ticks: { maxTicksLimit: 10 }
+                    },
+                    y: {
+                        title: { display: true, text: 'Pixel Count' },
+                        beginAtZero: true
+                    }
+                }
+            }
+        }));
     </script>
 </body>
 </html>
-"""
-    
-    return html
+""")
+
+
+def write_histogram_html(
+    fp,
+    histograms: Dict[str, Dict],
+    title: str = "Soil Index Histograms",
+    images: Dict[str, str] = None
+) -> None:
+    """
+    Stream the histogram HTML document to an open file object.
+
+    Writing each fragment as it is generated keeps peak memory at one
+    fragment instead of the whole document — relevant when images holds
+    large base64-encoded thumbnails. Only the per-chart scripts are
+    buffered, since they belong at the end of the document.
+
+    Args:
+        fp: Writable text file object.
+        histograms: Dictionary of histogram data.
+        title: Page title.
+        images: Dictionary of image name to base64 data URL or file path.
+    """
+    colors = [
+        'rgba(75, 192, 192, 0.7)',
+        'rgba(255, 99, 132, 0.7)',
+        'rgba(54, 162, 235, 0.7)',
+        'rgba(255, 206, 86, 0.7)',
+        'rgba(153, 102, 255, 0.7)',
+        'rgba(255, 159, 64, 0.7)',
+        'rgba(199, 199, 199, 0.7)',
+        'rgba(83, 102, 255, 0.7)',
+        'rgba(255, 99, 255, 0.7)',
+        'rgba(99, 255, 132, 0.7)',
+    ]
+
+    fp.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+{_HTML_STYLE}
+    </style>
+</head>
+<body>
+    <h1>📊 {title}</h1>
+    <p class="subtitle">Satellite imagery and soil quality index analysis</p>
+""")
+
+    # Stream the images section if provided
+    if images:
+        fp.write("""
+        <h2 class="section-title">🛰️ Satellite Imagery</h2>
+        <div class="images-grid">
+        """)
+        for img_name, img_data in images.items():
+            fp.write(f"""
+            <div class="image-container">
+                <h3>{img_name}</h3>
+                <img src="{img_data}" alt="{img_name}" />
+            </div>
+            """)
+        fp.write("</div>")
+
+    fp.write("""
+    <h2 class="section-title">📈 Index Histograms</h2>
+    <div class="charts-grid">
+""")
+
+    # One chart definition per index; the Chart.js constructor options
+    # are emitted once and looped over client-side, so the document
+    # carries N small data blobs instead of N copies of the template
+    chart_defs = []
+
+    # Cycling the palette alongside the items makes the color rotation
+    # explicit and drops the enumerate counter and modulo per chart
+    for (index_name, hist_data), color in zip(
+        histograms.items(), itertools.cycle(colors)
+    ):
+        buckets = hist_data.get("buckets", [])
+        counts = hist_data.get("counts", [])
+
+        if not buckets or not counts:
+            continue
+
+        total_pixels, mean_val = _hist_stats(hist_data)
+
+        canvas_id = f"chart_{index_name}"
+        border_color = color.replace("0.7", "1")
+
+        fp.write(_CHART_CONTAINER_TEMPLATE.substitute(
+            canvas=canvas_id,
+            pixels=f"{total_pixels:,}",
+            mean=f"{mean_val:.4f}"
+        ))
+
+        # Format data for JavaScript (numpy's %-formatting runs the
+        # per-bucket loop in C when available)
+        if np is not None:
+            labels = np.char.mod("%.3f", np.asarray(buckets)).tolist()
+        else:
+            labels = [f"{b:.3f}" for b in buckets]
+
+        chart_defs.append({
+            "id": canvas_id,
+            "label": index_name,
+            "color": color,
+            "borderColor": border_color,
+            "labels": labels,
+            "data": counts,
+        })
+
+    fp.write("""
+    </div>
+""")
+    fp.write(_HTML_LEGEND)
+
+    fp.write(_CHARTS_SCRIPT_TEMPLATE.substitute(charts=_json_dumps(chart_defs)))
+
+
+def generate_histogram_html(
+    histograms: Dict[str, Dict],
+    title: str = "Soil Index Histograms",
+    images: Dict[str, str] = None
+) -> str:
+    """
+    Generate an HTML page with interactive histograms using Chart.js.
+
+    Thin wrapper over write_histogram_html for callers that want the
+    whole document as a string.
+
+    Args:
+        histograms: Dictionary of histogram data.
+        title: Page title.
+        images: Dictionary of image name to base64 data URL or file path.
+
+    Returns:
+        str: HTML content.
+    """
+    buf = io.StringIO()
+    write_histogram_html(buf, histograms, title, images)
+    return buf.getvalue()
 
 
 def save_histogram_html(
@@ -633,11 +1449,16 @@ def save_histogram_html(
     Returns:
         str: Path to saved file.
     """
-    html = generate_histogram_html(histograms, title, images)
-    
-    with open(filepath, 'w') as f:
-        f.write(html)
-    
+    # Stream straight to disk; a large write buffer keeps syscalls rare
+    # without ever holding the whole document in memory. Writing to a
+    # sibling temp file and swapping it in with os.replace means readers
+    # never see a half-written report.
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='',
+              buffering=1024 * 1024) as f:
+        write_histogram_html(f, histograms, title, images)
+    os.replace(tmp_path, filepath)
+
     print(f"✓ Saved histogram visualization to {filepath}")
     return filepath
 
@@ -656,18 +1477,26 @@ def save_histogram_csv(
     Returns:
         str: Path to saved file.
     """
-    lines = ["index,bucket_value,pixel_count"]
-    
-    for index_name, hist_data in histograms.items():
-        buckets = hist_data.get("buckets", [])
-        counts = hist_data.get("counts", [])
-        
-        for bucket, count in zip(buckets, counts):
-            lines.append(f"{index_name},{bucket:.6f},{int(count)}")
-    
-    with open(filepath, 'w') as f:
-        f.write('\n'.join(lines))
-    
+    # Stream rows through the C-implemented csv writer instead of
+    # formatting every line in Python and holding the whole file in
+    # memory before writing; the temp-file swap keeps the visible file
+    # complete at all times
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='',
+              buffering=1024 * 1024) as f:
+        writer = csv.writer(f)
+        writer.writerow(["index", "bucket_value", "pixel_count"])
+
+        for index_name, hist_data in histograms.items():
+            buckets = hist_data.get("buckets", [])
+            counts = hist_data.get("counts", [])
+
+            writer.writerows(
+                (index_name, f"{bucket:.6f}", int(count))
+                for bucket, count in zip(buckets, counts)
+            )
+    os.replace(tmp_path, filepath)
+
     print(f"✓ Saved histogram data to {filepath}")
     return filepath
 
@@ -691,13 +1520,13 @@ def save_histogram_json(
     for index_name, hist_data in histograms.items():
         buckets = hist_data.get("buckets", [])
         counts = hist_data.get("counts", [])
-        
-        total_pixels = sum(counts) if counts else 0
-        weighted_sum = sum(b * c for b, c in zip(buckets, counts)) if buckets and counts else 0
-        mean_val = weighted_sum / total_pixels if total_pixels > 0 else 0
-        
+
+        total_pixels, mean_val = _hist_stats(hist_data)
+
         output[index_name] = {
-            **hist_data,
+            # The cached underscore keys stay internal; the public
+            # statistics block below carries the same values
+            **{k: v for k, v in hist_data.items() if not k.startswith("_")},
             "statistics": {
                 "total_pixels": total_pixels,
                 "mean": mean_val,
@@ -706,9 +1535,19 @@ def save_histogram_json(
             }
         }
     
-    with open(filepath, 'w') as f:
-        json.dump(output, f, indent=2)
-    
+    # orjson hands back UTF-8 bytes, so the binary write skips the
+    # TextIOWrapper re-encode entirely; both paths go through a temp
+    # file swapped in with os.replace so a crash never leaves a partial
+    # JSON on disk
+    tmp_path = filepath + '.tmp'
+    if orjson is not None:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+    os.replace(tmp_path, filepath)
+
     print(f"✓ Saved histogram JSON to {filepath}")
     return filepath
 
@@ -733,21 +1572,25 @@ def calculate_percentiles(
     Returns:
         dict: Percentile to value mapping.
     """
-    band = image.select(band_name)
-    
-    result = band.reduceRegion(
-        reducer=ee.Reducer.percentile(percentiles),
-        geometry=roi,
-        scale=scale,
-        maxPixels=1e9
-    ).getInfo()
-    
-    percentile_values = {}
-    for p in percentiles:
-        key = f"{band_name}_p{p}"
-        percentile_values[p] = result.get(key)
-    
-    return percentile_values
+    def _compute():
+        band = image.select(band_name)
+
+        result = band.reduceRegion(
+            reducer=ee.Reducer.percentile(percentiles),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        ).getInfo()
+
+        percentile_values = {}
+        for p in percentiles:
+            key = f"{band_name}_p{p}"
+            percentile_values[p] = result.get(key)
+
+        return percentile_values
+
+    extra = ("percentiles", band_name, scale, tuple(percentiles))
+    return _cached_reduction(image, roi, extra, _compute)
 
 
 def get_comprehensive_stats(
@@ -768,28 +1611,37 @@ def get_comprehensive_stats(
     Returns:
         dict: Comprehensive statistics.
     """
-    band = image.select(band_name)
-    
-    # Basic statistics
-    stats = band.reduceRegion(
-        reducer=ee.Reducer.mean()
-            .combine(ee.Reducer.stdDev(), sharedInputs=True)
-            .combine(ee.Reducer.minMax(), sharedInputs=True)
-            .combine(ee.Reducer.count(), sharedInputs=True),
-        geometry=roi,
-        scale=scale,
-        maxPixels=1e9
-    ).getInfo()
-    
-    # Percentiles
-    percentiles = calculate_percentiles(image, band_name, roi, [5, 25, 50, 75, 95], scale)
-    
-    return {
-        "band": band_name,
-        "mean": stats.get(f"{band_name}_mean"),
-        "std_dev": stats.get(f"{band_name}_stdDev"),
-        "min": stats.get(f"{band_name}_min"),
-        "max": stats.get(f"{band_name}_max"),
-        "count": stats.get(f"{band_name}_count"),
-        "percentiles": percentiles
-    }
\ No newline at end of file
+    def _compute():
+        band = image.select(band_name)
+
+        percentile_levels = [5, 25, 50, 75, 95]
+
+        # One combined reducer covers the basic statistics and the
+        # percentiles, so a single tile scan and one round-trip replace
+        # the former stats + calculate_percentiles pair of calls
+        stats = band.reduceRegion(
+            reducer=ee.Reducer.mean()
+                .combine(ee.Reducer.stdDev(), sharedInputs=True)
+                .combine(ee.Reducer.minMax(), sharedInputs=True)
+                .combine(ee.Reducer.count(), sharedInputs=True)
+                .combine(ee.Reducer.percentile(percentile_levels), sharedInputs=True),
+            geometry=roi,
+            scale=scale,
+            maxPixels=1e9
+        ).getInfo()
+
+        percentiles = {
+            p: stats.get(f"{band_name}_p{p}") for p in percentile_levels
+        }
+
+        return {
+            "band": band_name,
+            "mean": stats.get(f"{band_name}_mean"),
+            "std_dev": stats.get(f"{band_name}_stdDev"),
+            "min": stats.get(f"{band_name}_min"),
+            "max": stats.get(f"{band_name}_max"),
+            "count": stats.get(f"{band_name}_count"),
+            "percentiles": percentiles
+        }
+
+    return _cached_reduction(image, roi, ("comprehensive", band_name, scale), _compute)
\ No newline at end of file
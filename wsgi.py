@@ -0,0 +1,16 @@
+"""
+WSGI entry point for production servers.
+
+Flask's built-in dev server is single-threaded, so concurrent
+/api/analyze requests would be serialized behind each other's Earth
+Engine latency. Run the app under a pooled WSGI server instead:
+
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:5000 wsgi:application
+
+The EE HTTP transport is thread-safe, so worker threads multiplex
+cleanly with the thread pool inside analyze_fun.
+"""
+
+from app import app
+
+application = app